@@ -1,23 +1,30 @@
 """Better Calendar integration for Home Assistant."""
 import logging
 import asyncio
+import time
 from pathlib import Path
 from typing import Any, Dict
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform, EVENT_HOMEASSISTANT_STARTED
-from homeassistant.core import HomeAssistant, Event
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.typing import ConfigType
 
 from .const import DOMAIN
 from .coordinator import BetterCalendarCoordinator
+from .persistence import events_store, notifications_store
 from .services import async_setup_services, async_unload_services
+from .websocket_api import async_register_websocket_commands
 from . import utils
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+# Stato dell'aggiornamento di avvio condiviso (fuori da hass.data[DOMAIN], che contiene solo le entry)
+STARTUP_REFRESH_KEY = f"{DOMAIN}_startup_refresh"
+
 
 async def _register_lovelace_card_if_exists(hass: HomeAssistant) -> None:
     """Registra automaticamente la card Lovelace se il file esiste."""
@@ -52,59 +59,57 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Imposta il componente Better Calendar."""
     hass.data.setdefault(DOMAIN, {})
     
+    # Comandi websocket per la card (eventi per intervallo dallo snapshot in memoria)
+    async_register_websocket_commands(hass)
+    
     # Registra automaticamente la card Lovelace se esiste
     await _register_lovelace_card_if_exists(hass)
     
-    # Aggiungi listener per ricarica automatica dopo riavvio HA
-    async def _handle_ha_started(event: Event) -> None:
-        """Gestisce l'evento di avvio completo di Home Assistant."""
-        _LOGGER.info("🚀 Home Assistant avviato, programmando ricarica Better Calendar in 15 secondi...")
-        
-        # Aspetta 15 secondi e poi ricarica tutti i coordinator
-        await asyncio.sleep(15)
-        
-        try:
-            # Trova tutti i coordinator attivi
-            coordinators = []
-            for entry_id, entry_data in hass.data.get(DOMAIN, {}).items():
-                if isinstance(entry_data, dict) and "coordinator" in entry_data:
-                    coordinators.append(entry_data["coordinator"])
-            
-            if coordinators:
-                _LOGGER.info(f"🔄 Ricaricando {len(coordinators)} coordinator Better Calendar...")
-                
-                # Ricarica tutti i coordinator
-                for coordinator in coordinators:
-                    try:
-                        await coordinator.async_refresh()
-                        _LOGGER.info(f"✅ Coordinator {coordinator.name} ricaricato con successo")
-                    except Exception as e:
-                        _LOGGER.error(f"❌ Errore ricaricando coordinator {coordinator.name}: {e}")
-                
-                _LOGGER.info("🎉 Ricarica automatica Better Calendar completata!")
-            else:
-                _LOGGER.warning("⚠️ Nessun coordinator Better Calendar trovato per la ricarica")
-                
-        except Exception as e:
-            _LOGGER.error(f"❌ Errore durante ricarica automatica Better Calendar: {e}")
-    
-    # Registra il listener per l'evento di avvio
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _handle_ha_started)
-    
     return True
 
 
+@callback
+def _async_queue_startup_refresh(hass: HomeAssistant, coordinator: BetterCalendarCoordinator) -> None:
+    """Accoda il coordinator all'unico aggiornamento eseguito ad avvio di HA completato.
+
+    Le entry caricate durante l'avvio condividono un solo aggiornamento; quelle
+    aggiunte o ricaricate dopo vengono aggiornate subito.
+    """
+    startup = hass.data.setdefault(STARTUP_REFRESH_KEY, {"pending": [], "scheduled": False})
+    startup["pending"].append(coordinator)
+    if startup["scheduled"]:
+        return
+    startup["scheduled"] = True
+    startup["setup_started"] = time.monotonic()
+
+    async def _async_startup_refresh(hass: HomeAssistant) -> None:
+        coordinators = startup["pending"]
+        startup["pending"] = []
+        startup["scheduled"] = False
+        
+        started = time.monotonic()
+        await asyncio.gather(*(coordinator.async_startup_refresh() for coordinator in coordinators))
+        startup["last_refresh_seconds"] = round(time.monotonic() - started, 2)
+        _LOGGER.info(
+            f"🎉 Aggiornamento di avvio di {len(coordinators)} coordinator Better Calendar in "
+            f"{startup['last_refresh_seconds']}s "
+            f"({round(time.monotonic() - startup['setup_started'], 1)}s dal setup)"
+        )
+
+    async_at_started(hass, _async_startup_refresh)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Better Calendar from a config entry."""
     
     # Crea il coordinator
     coordinator = BetterCalendarCoordinator(hass, entry)
     
-    # Setup del coordinator (avvia sistema notifiche)
+    # Setup del coordinator: pubblica subito l'ultimo snapshot salvato
     await coordinator.async_setup()
     
-    # Primo aggiornamento dati
-    await coordinator.async_config_entry_first_refresh()
+    # Primo aggiornamento dati: uno solo, in background, ad avvio di HA completato
+    _async_queue_startup_refresh(hass, coordinator)
     
     # Salva il coordinator nei dati dell'integrazione
     hass.data.setdefault(DOMAIN, {})
@@ -113,6 +118,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "config": entry.data,
     }
     
+    # Le modifiche alle opzioni (calendari, intervallo, finestre) arrivano al coordinator
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
+    
     # Setup delle piattaforme
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
@@ -162,4 +170,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if not hass.data[DOMAIN]:
             await async_unload_services(hass)
             hass.data.pop(DOMAIN, None)
-    return unload_ok 
\ No newline at end of file
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Rimuove i dati salvati in .storage quando l'entry viene eliminata."""
+    await events_store(hass, entry.entry_id).async_remove()
+    await notifications_store(hass, entry.entry_id).async_remove()
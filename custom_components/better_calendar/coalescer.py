@@ -0,0 +1,62 @@
+"""Aggiornamenti raggruppati dopo le modifiche agli eventi di Better Calendar."""
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+
+class RefreshCoalescer:
+    """Un solo aggiornamento in corso alla volta.
+
+    Le richieste che arrivano mentre un aggiornamento è in corso confluiscono
+    in un unico aggiornamento finale, che parte dopo di esse: chi attende vede
+    sempre dati scaricati dopo la propria modifica.
+    """
+
+    def __init__(self, refresh: Callable[[], Awaitable[None]]) -> None:
+        """Inizializza il coalescer con la funzione di aggiornamento."""
+        self._refresh = refresh
+        self._waiters: List[asyncio.Future] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def async_request(self) -> None:
+        """Richiede un aggiornamento e ne attende il completamento."""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        if self._task is None:
+            self._task = loop.create_task(self._async_run())
+        await waiter
+
+    def async_cancel(self) -> None:
+        """Annulla l'aggiornamento in corso e le richieste in attesa (unload)."""
+        if self._task is not None:
+            self._task.cancel()
+        self._cancel_waiters(self._waiters)
+        self._waiters = []
+
+    async def _async_run(self) -> None:
+        """Esegue gli aggiornamenti finché ci sono richieste in attesa."""
+        try:
+            while self._waiters:
+                waiters, self._waiters = self._waiters, []
+                try:
+                    await self._refresh()
+                except asyncio.CancelledError:
+                    self._cancel_waiters(waiters)
+                    raise
+                except Exception as err:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                else:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+        finally:
+            self._task = None
+
+    @staticmethod
+    def _cancel_waiters(waiters: List[asyncio.Future]) -> None:
+        """Annulla le richieste non ancora completate."""
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.cancel()
@@ -12,6 +12,14 @@ from homeassistant.helpers import config_validation as cv
 from .const import (
     DOMAIN, 
     COMPONENT_NAME,
+    DEFAULT_MAX_CONCURRENT_FETCHES,
+    DEFAULT_FETCH_TIMEOUT,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_NOTIFICATION_GRACE,
+    DEFAULT_NEAR_PAST_DAYS,
+    DEFAULT_NEAR_FUTURE_DAYS,
+    DEFAULT_FAR_PAST_DAYS,
+    DEFAULT_FAR_FUTURE_DAYS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -53,6 +61,22 @@ class BetterCalendarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 "update_interval", 
                 default=5
             ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+            vol.Optional(
+                "max_update_interval",
+                default=DEFAULT_MAX_UPDATE_INTERVAL
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+            vol.Optional(
+                "max_concurrent_fetches",
+                default=DEFAULT_MAX_CONCURRENT_FETCHES
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+            vol.Optional(
+                "fetch_timeout",
+                default=DEFAULT_FETCH_TIMEOUT
+            ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+            vol.Optional(
+                "notification_grace_minutes",
+                default=DEFAULT_NOTIFICATION_GRACE
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=240)),
         })
 
         return self.async_show_form(
@@ -102,7 +126,7 @@ class BetterCalendarOptionsFlowHandler(config_entries.OptionsFlow):
             return self.async_create_entry(title="", data=user_input)
 
         # Ottieni la configurazione corrente usando il metodo moderno
-        current_config = self._config_entry.data
+        current_config = {**self._config_entry.data, **self._config_entry.options}
         available_calendars = self._get_available_calendars()
 
         # Schema per le opzioni
@@ -115,6 +139,38 @@ class BetterCalendarOptionsFlowHandler(config_entries.OptionsFlow):
                 "update_interval",
                 default=current_config.get("update_interval", 5)
             ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+            vol.Optional(
+                "max_update_interval",
+                default=current_config.get("max_update_interval", DEFAULT_MAX_UPDATE_INTERVAL)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+            vol.Optional(
+                "max_concurrent_fetches",
+                default=current_config.get("max_concurrent_fetches", DEFAULT_MAX_CONCURRENT_FETCHES)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+            vol.Optional(
+                "fetch_timeout",
+                default=current_config.get("fetch_timeout", DEFAULT_FETCH_TIMEOUT)
+            ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+            vol.Optional(
+                "notification_grace_minutes",
+                default=current_config.get("notification_grace_minutes", DEFAULT_NOTIFICATION_GRACE)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=240)),
+            vol.Optional(
+                "near_past_days",
+                default=current_config.get("near_past_days", DEFAULT_NEAR_PAST_DAYS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=30)),
+            vol.Optional(
+                "near_future_days",
+                default=current_config.get("near_future_days", DEFAULT_NEAR_FUTURE_DAYS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=90)),
+            vol.Optional(
+                "far_past_days",
+                default=current_config.get("far_past_days", DEFAULT_FAR_PAST_DAYS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=365)),
+            vol.Optional(
+                "far_future_days",
+                default=current_config.get("far_future_days", DEFAULT_FAR_FUTURE_DAYS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=730)),
         })
 
         return self.async_show_form(
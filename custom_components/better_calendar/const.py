@@ -6,6 +6,22 @@ COMPONENT_VERSION = "1.3.0"
 
 # Configurazione
 DEFAULT_UPDATE_INTERVAL = 5  # minuti
+DEFAULT_MAX_UPDATE_INTERVAL = 240  # minuti: limite dell'intervallo adattivo dei calendari che non cambiano
+DEFAULT_MAX_CONCURRENT_FETCHES = 4  # calendari scaricati in parallelo
+DEFAULT_FETCH_TIMEOUT = 30  # secondi per singolo calendario
+DEFAULT_NEAR_PAST_DAYS = 1  # finestra vicina, scaricata a ogni aggiornamento
+DEFAULT_NEAR_FUTURE_DAYS = 14
+DEFAULT_FAR_PAST_DAYS = 30  # finestra lontana, scaricata ogni FAR_WINDOW_REFRESH_HOURS
+DEFAULT_FAR_FUTURE_DAYS = 120
+FAR_WINDOW_REFRESH_HOURS = 6
+MAX_CONCURRENT_EVENT_WRITES = 5  # eventi scritti in parallelo dai servizi di creazione multipla
+CALENDAR_CHANGE_DEBOUNCE = 10  # secondi: cambi di stato ravvicinati di un calendario diventano un solo aggiornamento
+PROVISIONAL_UID_PREFIX = "better_calendar_"  # uid degli eventi creati, finché il calendario non li conferma
+DEFAULT_NOTIFICATION_GRACE = 15  # minuti: notifiche in ritardo ancora inviate
+MAX_CONCURRENT_NOTIFICATION_SENDS = 5  # notifiche inviate in parallelo
+NOTIFICATION_RETRY_SECONDS = 60  # nuovo tentativo di una notifica non consegnata (entro la tolleranza)
+IMPORT_MAX_REPORTED_ERRORS = 20  # errori elencati nella risposta di import_ics (gli altri solo contati)
+NOTIFICATION_EXPIRY_HOURS = 2  # ore dopo l'orario di invio oltre cui una notifica è obsoleta
 
 # Device info
 DEVICE_MANUFACTURER = "Better Calendar"
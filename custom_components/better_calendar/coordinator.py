@@ -1,18 +1,50 @@
 """Coordinator per Better Calendar."""
 import asyncio
-import json
 import logging
 import os
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from homeassistant.components.calendar import CalendarEntity
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.components.calendar import (
+    DOMAIN as CALENDAR_DOMAIN,
+    CalendarEntity,
+    CalendarEntityFeature,
+    CalendarEvent,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers import device_registry as dr
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, DEVICE_MANUFACTURER, DEVICE_MODEL, DEVICE_NAME, DEFAULT_UPDATE_INTERVAL
+from .const import (
+    DOMAIN,
+    DEVICE_MANUFACTURER,
+    DEVICE_MODEL,
+    DEVICE_NAME,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_FETCHES,
+    DEFAULT_FETCH_TIMEOUT,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    CALENDAR_CHANGE_DEBOUNCE,
+    MAX_CONCURRENT_EVENT_WRITES,
+    IMPORT_MAX_REPORTED_ERRORS,
+    PROVISIONAL_UID_PREFIX,
+    DEFAULT_NEAR_PAST_DAYS,
+    DEFAULT_NEAR_FUTURE_DAYS,
+    DEFAULT_FAR_PAST_DAYS,
+    DEFAULT_FAR_FUTURE_DAYS,
+    FAR_WINDOW_REFRESH_HOURS,
+)
+from .coalescer import RefreshCoalescer
+from .delta import CalendarDelta, diff_calendar_events, event_key
+from .ics import iter_ics_events, next_batch
+from .index import EventIndex, EventSnapshot
+from .models import EventRecord
+from .persistence import EventsSnapshotWriter, events_store, snapshot_hash
+from .polling import AdaptivePollPlanner
 # Sistema di notifiche ora integrato nel sensore BetterCalendarNotifications
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,16 +56,18 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
     def __init__(self, hass: HomeAssistant, config_entry):
         """Inizializza il coordinator."""
         self.config_entry = config_entry
-        self.calendar_entities = config_entry.data.get("selected_calendars", [])
+        self.calendar_entities = self._get_option("selected_calendars", [])
         
-        # Ottieni l'intervallo di aggiornamento dalla configurazione utente
-        user_update_interval = config_entry.data.get("update_interval", DEFAULT_UPDATE_INTERVAL)
+        # Ottieni l'intervallo di aggiornamento dalla configurazione utente (opzioni prima dei dati)
+        user_update_interval = self._get_option("update_interval", DEFAULT_UPDATE_INTERVAL)
         
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_{config_entry.entry_id}",
             update_interval=timedelta(minutes=user_update_interval),
+            # Notifica i sensori solo se i dati sono cambiati davvero
+            always_update=False,
         )
         self.hass = hass
         self.entry_id = config_entry.entry_id
@@ -41,11 +75,61 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
         self._calendar_entities: Dict[str, Any] = {}
         self._events: Dict[str, List[Dict[str, Any]]] = {}
         
+        # Fetch in corso (annullabile durante l'unload)
+        self._fetch_future: Optional[asyncio.Future] = None
+        self._unloading = False
+        
+        # Impronte degli eventi dell'ultima sincronizzazione e relativi delta
+        self._fingerprints: Dict[str, Dict[str, str]] = {}
+        self.last_deltas: Dict[str, CalendarDelta] = {}
+        
+        # Eventi già convertiti in record compatti, per calendario
+        self._records_by_calendar: Dict[str, List[EventRecord]] = {}
+        
+        # Snapshot immutabile (indice + eventi per giorno locale) servito alle query
+        self.snapshot = EventSnapshot(0, EventIndex([]), {})
+        self._window: Optional[Tuple[date, date]] = None
+        
+        # Finestra lontana scaricata solo ogni FAR_WINDOW_REFRESH_HOURS (o su richiesta esplicita)
+        self._far_fetched_at: Dict[str, float] = {}
+        self._force_far_fetch = False
+        
+        # Intervallo adattivo per calendario: update_interval è il minimo, max_update_interval il massimo
+        self._poll_planner = AdaptivePollPlanner(
+            self.update_interval.total_seconds(),
+            self._get_option("max_update_interval", DEFAULT_MAX_UPDATE_INTERVAL) * 60,
+        )
+        self._failed_fetches: Set[str] = set()
+        
+        # Aggiornamenti dopo create/update/delete: solo i calendari modificati, uno alla volta,
+        # e le richieste ravvicinate ne fanno uno solo
+        self._written_calendars: Set[str] = set()
+        self._write_refresh = RefreshCoalescer(self._async_refresh_written_calendars)
+        
+        # Aggiornamenti mirati quando cambia lo stato di un calendario (raggruppati dal debouncer)
+        self._refresh_lock = asyncio.Lock()
+        self._pending_calendars: Set[str] = set()
+        self._unsub_state_changes = None
+        self._calendar_change_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=CALENDAR_CHANGE_DEBOUNCE,
+            immediate=False,
+            function=self._async_refresh_pending_calendars,
+        )
+        
 # Configurazione completata
         
-        # File JSON per salvare gli eventi nella directory del componente
+        # Snapshot degli eventi in .storage (il vecchio file nella directory del componente viene migrato)
         component_dir = os.path.dirname(__file__)
-        self.events_file = os.path.join(component_dir, f"better_calendar_events_{config_entry.entry_id}.json")
+        self._legacy_events_file = os.path.join(component_dir, f"better_calendar_events_{config_entry.entry_id}.json")
+        self._events_store = events_store(hass, config_entry.entry_id)
+        self._snapshot_writer = EventsSnapshotWriter(self._events_store)
+        self._stored_snapshot: Optional[Dict[str, Any]] = None
+        
+        # Metriche di avvio: pubblicazione dello snapshot salvato e primo aggiornamento completo
+        self.warm_start_ms: Optional[float] = None
+        self.startup_refresh_seconds: Optional[float] = None
         
         # Crea il device
         self._setup_device()
@@ -73,44 +157,230 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
     def device_info(self):
         """Restituisce le informazioni del device."""
         return self._device_info
+
+    @property
+    def generation(self) -> int:
+        """Incrementata a ogni modifica dei dati: i sensori la usano come chiave di cache."""
+        return self.snapshot.generation
+
+    @property
+    def index(self) -> EventIndex:
+        """Indice a intervalli dello snapshot corrente."""
+        return self.snapshot.index
+
+    @property
+    def records(self) -> List[EventRecord]:
+        """Record dello snapshot corrente, ordinati per inizio."""
+        return self.snapshot.records
         
     async def async_setup(self):
-        """Setup del coordinator."""
-        # Forza un aggiornamento immediato all'avvio
+        """Setup del coordinator: pubblica subito l'ultimo snapshot salvato.
+
+        Nessun download qui: il primo aggiornamento completo parte una sola
+        volta, ad avvio di HA completato (vedi async_startup_refresh).
+        """
+        started = time.monotonic()
         try:
-            await self.async_request_refresh()
+            self._stored_snapshot = await self._events_store.async_load_or_import(self._legacy_events_file)
+            self._snapshot_writer.set_persisted(self._stored_snapshot)
+            if self._stored_snapshot and self.data is None:
+                # Avvio a caldo: sensori e card partono dagli eventi salvati
+                warm_state = await self.hass.async_add_executor_job(
+                    self._build_warm_state, self._stored_snapshot
+                )
+                if self.data is None:
+                    self._publish_warm_state(*warm_state)
+                    self.warm_start_ms = round((time.monotonic() - started) * 1000, 1)
+                    _LOGGER.debug(f"⚡ Snapshot salvato pubblicato in {self.warm_start_ms} ms")
         except Exception as e:
-            _LOGGER.warning(f"⚠️ Errore durante la sincronizzazione immediata: {e}")
-            pass
+            _LOGGER.warning(f"⚠️ Errore caricando gli eventi salvati: {e}")
+        
+        self._subscribe_calendar_changes()
+
+    async def async_startup_refresh(self) -> None:
+        """Primo aggiornamento completo dopo l'avvio di Home Assistant."""
+        if self._unloading:
+            return
+        started = time.monotonic()
+        await self.async_refresh()
+        self.startup_refresh_seconds = round(time.monotonic() - started, 2)
+        _LOGGER.info(
+            f"🚀 Primo aggiornamento di {self.name} in {self.startup_refresh_seconds}s "
+            f"(snapshot salvato pubblicato in {self.warm_start_ms} ms)"
+        )
+        # Le metriche compaiono anche se l'aggiornamento non ha trovato modifiche
+        self.async_update_listeners()
 
     async def async_unload(self):
         """Cleanup del coordinator."""
-        pass
+        self._unloading = True
+        
+        if self._unsub_state_changes is not None:
+            self._unsub_state_changes()
+            self._unsub_state_changes = None
+        self._calendar_change_debouncer.async_cancel()
+        self._write_refresh.async_cancel()
+        self._pending_calendars.clear()
+        
+        # Annulla gli eventuali fetch dei calendari ancora in corso
+        if self._fetch_future is not None and not self._fetch_future.done():
+            self._fetch_future.cancel()
+        
+        await self.async_shutdown()
 
     async def async_config_entry_updated(self, hass: HomeAssistant, config_entry):
         """Gestisce l'aggiornamento della configurazione."""
+        # Le opzioni modificate si leggono dalla entry aggiornata
+        self.config_entry = config_entry
+        self.config = config_entry.data
+        
         # Aggiorna i calendari selezionati
         old_calendars = self.calendar_entities
-        new_calendars = config_entry.data.get("selected_calendars", [])
+        new_calendars = self._get_option("selected_calendars", [])
         
-        if old_calendars != new_calendars:
+        calendars_changed = old_calendars != new_calendars
+        if calendars_changed:
             self.calendar_entities = new_calendars
+            self._subscribe_calendar_changes()
         
         # Aggiorna l'intervallo di aggiornamento
-        new_update_interval = config_entry.data.get("update_interval", DEFAULT_UPDATE_INTERVAL)
+        new_update_interval = self._get_option("update_interval", DEFAULT_UPDATE_INTERVAL)
         current_interval_minutes = self.update_interval.total_seconds() / 60
-        
-        if new_update_interval != current_interval_minutes:
+        interval_changed = new_update_interval != current_interval_minutes
+        if interval_changed:
             self.update_interval = timedelta(minutes=new_update_interval)
+        
+        if calendars_changed or interval_changed:
             # Forza un aggiornamento immediato
             await self.async_request_refresh()
         
-        # Aggiorna la configurazione interna
-        self.config_entry = config_entry
-        self.config = config_entry.data
+        # Le finestre potrebbero essere cambiate: la prossima sincronizzazione riscarica quella lontana
+        self._far_fetched_at.clear()
+
+    async def async_refresh(self) -> None:
+        """Aggiornamento esplicito (servizi, modifiche eventi): scarica tutti i calendari.
+
+        I cicli programmati passano da _async_refresh e scaricano solo i calendari in scadenza.
+        """
+        self._poll_planner.mark_due()
+        self._force_far_fetch = True
+        await super().async_refresh()
+
+    @callback
+    def _subscribe_calendar_changes(self) -> None:
+        """Ascolta i cambi di stato dei calendari selezionati."""
+        if self._unsub_state_changes is not None:
+            self._unsub_state_changes()
+            self._unsub_state_changes = None
+        if self.calendar_entities:
+            self._unsub_state_changes = async_track_state_change_event(
+                self.hass, list(self.calendar_entities), self._handle_calendar_state_change
+            )
+
+    @callback
+    def _handle_calendar_state_change(self, event: Event) -> None:
+        """Un calendario ha cambiato stato: programma il suo aggiornamento mirato."""
+        if event.data.get("new_state") is None or self._unloading:
+            return
+        self._pending_calendars.add(event.data["entity_id"])
+        self.hass.async_create_task(self._calendar_change_debouncer.async_call())
+
+    async def _async_refresh_pending_calendars(self) -> None:
+        """Scarica solo i calendari che hanno cambiato stato."""
+        calendar_ids = [
+            calendar_id for calendar_id in self._pending_calendars if calendar_id in self.calendar_entities
+        ]
+        self._pending_calendars.clear()
+        if not calendar_ids or self._unloading:
+            return
+        await self._async_refresh_calendars(calendar_ids)
+
+    async def _async_refresh_written_calendars(self) -> None:
+        """Riscarica i calendari scritti da create/update/delete: conferma o corregge le scritture ottimistiche."""
+        calendar_ids = list(self._written_calendars)
+        self._written_calendars.clear()
+        if not calendar_ids or self._unloading:
+            return
+        if self.data is None or self._window is None:
+            # Nessuna sincronizzazione completa ancora: serve quella
+            await self.async_refresh()
+            return
+        # Una scrittura può cadere ovunque: si riscarica l'intera finestra
+        await self._async_refresh_calendars(calendar_ids, full=True)
+
+    async def _async_refresh_calendars(self, calendar_ids: List[str], full: bool = False) -> None:
+        """Scarica solo i calendari indicati e pubblica i loro delta."""
+        async with self._refresh_lock:
+            if self.data is None or self._window is None:
+                # Nessuna sincronizzazione completa ancora: ci penserà il prossimo aggiornamento
+                return
+            
+            now = dt_util.now()
+            try:
+                results = await self._async_fetch_calendars(calendar_ids, now, full)
+            except asyncio.CancelledError:
+                if self._unloading:
+                    _LOGGER.debug(f"🛑 Aggiornamento mirato di {calendar_ids} interrotto: entry in fase di rimozione")
+                    return
+                raise
+            
+            fetched_events = dict(self.data)
+            fetched_events.update(zip(calendar_ids, results))
+            all_events, deltas = self._apply_deltas(fetched_events)
+            
+            for calendar_id in calendar_ids:
+                if calendar_id in self._failed_fetches:
+                    self._poll_planner.record_failure(calendar_id, now.timestamp())
+                else:
+                    self._poll_planner.record_poll(calendar_id, calendar_id in deltas, now.timestamp())
+            
+            if not deltas:
+                _LOGGER.debug(f"✅ Nessuna modifica in {calendar_ids}")
+                return
+            
+            _LOGGER.debug(f"🔄 Aggiornamento mirato di {list(deltas)}")
+            # Stesso ordine dell'aggiornamento completo: generazione (già incrementata), delta, listener
+            self.last_deltas = deltas
+            self.data = all_events
+            self.async_update_listeners()
+            await self._async_save_snapshot(now)
+
+    async def _async_fetch_calendars(
+        self, calendar_ids: List[str], now: datetime, full: bool
+    ) -> List[List[Dict[str, Any]]]:
+        """Scarica i calendari indicati in parallelo, con il limite di download contemporanei.
+
+        Il download in corso è annullato da async_unload; gli errori dei
+        singoli calendari finiscono in _failed_fetches.
+        """
+        # Il tempo totale è quello del calendario più lento
+        max_concurrent = self._get_option("max_concurrent_fetches", DEFAULT_MAX_CONCURRENT_FETCHES)
+        fetch_timeout = self._get_option("fetch_timeout", DEFAULT_FETCH_TIMEOUT)
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        
+        async def _fetch_limited(entity_id: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._async_fetch_calendar_tiered(entity_id, fetch_timeout, now, full)
+        
+        self._failed_fetches.clear()
+        self._fetch_future = asyncio.gather(*(_fetch_limited(entity_id) for entity_id in calendar_ids))
+        try:
+            return await self._fetch_future
+        finally:
+            self._fetch_future = None
+
+    def _get_option(self, key: str, default: Any) -> Any:
+        """Legge un'opzione dando priorità a quelle del flusso opzioni."""
+        return self.config_entry.options.get(key, self.config_entry.data.get(key, default))
 
     async def _async_update_data(self):
         """Fetch data from API endpoint."""
+        # Un aggiornamento alla volta: quello completo e quelli mirati non si sovrappongono
+        async with self._refresh_lock:
+            return await self._async_update_all()
+
+    async def _async_update_all(self):
+        """Scarica i calendari in scadenza e calcola i delta."""
         try:
             # Verifica calendari disponibili in HA
             available_calendars = [entity_id for entity_id in self.hass.states.async_entity_ids() if entity_id.startswith("calendar.")]
@@ -119,207 +389,472 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
                 # Fallback: usa tutti i calendari disponibili
                 if available_calendars:
                     self.calendar_entities = available_calendars
+                    self._subscribe_calendar_changes()
                 else:
                     _LOGGER.error("❌ Nessun calendario disponibile in Home Assistant!")
                     return {}
             
-            # Ottieni la data/ora corrente
-            now = datetime.now()
+            # Ottieni la data/ora corrente nel fuso orario di Home Assistant
+            now = dt_util.now()
             
-            # Estendi il range per includere eventi passati (30 giorni indietro) e futuri (120 giorni avanti)
-            start_date = now.date() - timedelta(days=30)
-            end_date = now.date() + timedelta(days=120)
+            # Finestra sincronizzata: quella lontana (la vicina è scaricata a ogni ciclo, la lontana più di rado)
+            self._window = self._get_fetch_windows(now.date())[1]
+            full = self._force_far_fetch
+            self._force_far_fetch = False
             
-            all_events = {}
+            calendar_ids = list(self.calendar_entities)
+            now_ts = now.timestamp()
+            self._poll_planner.set_bounds(
+                self.update_interval.total_seconds(),
+                self._get_option("max_update_interval", DEFAULT_MAX_UPDATE_INTERVAL) * 60,
+            )
+            self._poll_planner.forget_missing(calendar_ids)
             
-            for entity_id in self.calendar_entities:
-                try:
-                    # Verifica che il calendario esista
-                    if entity_id not in self.hass.states.async_entity_ids():
-                        all_events[entity_id] = []
-                        continue
-                    
-                    # Usa il servizio get_events per ottenere gli eventi
-                    response = await self.hass.services.async_call(
-                        "calendar",
-                        "get_events",
-                        {
-                            "entity_id": entity_id,
-                            "start_date_time": start_date.isoformat(),
-                            "end_date_time": end_date.isoformat(),
-                        },
-                        blocking=True,
-                        return_response=True,
-                    )
-                    
-                    calendar_events = response.get(entity_id, {}).get("events", [])
-                    
-                    # Processa e filtra gli eventi
-                    processed_events = []
-                    
-                    for event in calendar_events:
-                        try:
-                            # Assicurati che l'evento abbia i campi necessari
-                            if not event.get("summary"):
-                                continue
-                                
-                            # Normalizza le date
-                            event_start = event.get("start")
-                            event_end = event.get("end")
-                            
-                            if not event_start or not event_end:
-                                continue
-                            
-                            # Gestisci eventi tutto il giorno vs con orario
-                            if isinstance(event_start, str) and "T" not in event_start:
-                                # Evento tutto il giorno
-                                event["allDay"] = True
-                                event["start"] = {"date": event_start}
-                                event["end"] = {"date": event_end}
-                            else:
-                                # Evento con orario - resetta i secondi
-                                event["allDay"] = False
-                                if isinstance(event_start, str):
-                                    # Converti in datetime, resetta secondi e riconverti in stringa
-                                    start_dt = datetime.fromisoformat(event_start.replace('Z', '+00:00'))
-                                    start_no_seconds = start_dt.replace(second=0, microsecond=0)
-                                    event["start"] = {"dateTime": start_no_seconds.isoformat()}
-                                if isinstance(event_end, str):
-                                    # Stessa cosa per l'orario di fine
-                                    end_dt = datetime.fromisoformat(event_end.replace('Z', '+00:00'))
-                                    end_no_seconds = end_dt.replace(second=0, microsecond=0)
-                                    event["end"] = {"dateTime": end_no_seconds.isoformat()}
-                            
-                            # Preserva l'ID originale di Google Calendar se disponibile
-                            original_id = event.get("uid")
-                            if original_id:
-                                # Salva l'ID originale di Google Calendar
-                                event["google_calendar_id"] = original_id
-                                # Mantieni anche l'ID originale come UID principale
-                                event["uid"] = original_id
-                            else:
-                                # Se non c'è un ID originale, genera uno con hash
-                                event["uid"] = f"{entity_id}_{hash(str(event))}"
-                                
-                            # Inizializza le notifiche come array vuoto (ora gestite separatamente)
-                            event["notifications"] = []
-                                
-                            processed_events.append(event)
-                            
-                        except Exception as e:
-                            _LOGGER.warning(f"⚠️ Errore processando evento: {e}")
-                            continue
-                    
-                    all_events[entity_id] = processed_events
-                    
-                except Exception as e:
-                    _LOGGER.error(f"❌ Errore recuperando eventi da {entity_id}: {e}")
-                    all_events[entity_id] = []
+            # Solo i calendari in scadenza: gli altri mantengono gli eventi già scaricati
+            previous_data = self.data or {}
+            due_ids = self._poll_planner.due_calendars(calendar_ids, now_ts)
+            due_ids += [
+                calendar_id
+                for calendar_id in calendar_ids
+                if calendar_id not in previous_data and calendar_id not in due_ids
+            ]
+            try:
+                results = await self._async_fetch_calendars(due_ids, now, full)
+            except asyncio.CancelledError:
+                if self._unloading:
+                    raise UpdateFailed("Aggiornamento interrotto: entry in fase di rimozione")
+                raise
             
-            # Salva gli eventi in un file JSON SENZA notifiche (ora gestite separatamente)
-            events_file = self.events_file
+            # Riletti dopo il download: una scrittura ottimistica può averli cambiati nel frattempo
+            current_data = self.data or {}
+            fetched_by_id = dict(zip(due_ids, results))
+            fetched_events = {
+                calendar_id: fetched_by_id[calendar_id] if calendar_id in fetched_by_id else current_data[calendar_id]
+                for calendar_id in calendar_ids
+            }
             
-            try:
-                # Pulisci gli eventi rimuovendo le notifiche (ora gestite separatamente)
-                def _clean_and_write_events_file():
-                    clean_events = {}
-                    for calendar_id, events in all_events.items():
-                        clean_events[calendar_id] = []
-                        for event in events:
-                            # Rimuovi le notifiche dal file events (ora gestite separatamente)
-                            event_copy = event.copy()
-                            event_copy["notifications"] = []
-                            clean_events[calendar_id].append(event_copy)
-                    
-                    # Salva solo gli eventi puliti
-                    events_data = {
-                        "last_updated": now.isoformat(),
-                        "events": clean_events
-                    }
-                    
-                    with open(events_file, 'w', encoding='utf-8') as f:
-                        json.dump(events_data, f, ensure_ascii=False, indent=2, default=str)
-                
-                await self.hass.async_add_executor_job(_clean_and_write_events_file)
-                _LOGGER.debug(f"✅ Eventi salvati in: {events_file}")
-                    
-            except Exception as e:
-                _LOGGER.error(f"❌ Errore salvando eventi: {e}")
+            # Confronta con la sincronizzazione precedente
+            all_events, deltas = self._apply_deltas(fetched_events)
+            self.last_deltas = deltas
+            
+            # Aggiorna gli intervalli: chi è cambiato torna al minimo, gli altri rallentano
+            for calendar_id in due_ids:
+                if calendar_id in self._failed_fetches:
+                    self._poll_planner.record_failure(calendar_id, now_ts)
+                else:
+                    self._poll_planner.record_poll(calendar_id, calendar_id in deltas, now_ts)
+            _LOGGER.debug(
+                "⏱️ Calendari scaricati: %d/%d, intervalli (min): %s",
+                len(due_ids),
+                len(calendar_ids),
+                {calendar_id: interval / 60 for calendar_id, interval in self._poll_planner.intervals().items()},
+            )
+            
+            if not deltas and self.data is not None:
+                # Nessuna modifica: niente scrittura su file e niente aggiornamento dei sensori
+                _LOGGER.debug("✅ Nessuna modifica ai calendari, aggiornamento saltato")
+                return self.data
+            
+            _LOGGER.debug(
+                "🔄 Calendari modificati: %s",
+                {
+                    calendar_id: (len(delta.added), len(delta.changed), len(delta.removed))
+                    for calendar_id, delta in deltas.items()
+                },
+            )
+            
+            # Salvato dopo che il coordinator ha pubblicato i nuovi dati (self.data è assegnato
+            # al ritorno): una scrittura ottimistica durante il salvataggio non va persa
+            self.hass.async_create_task(self._async_save_snapshot(now))
             
             return all_events
             
+        except UpdateFailed:
+            raise
         except Exception as e:
             _LOGGER.error(f"❌ Errore durante l'aggiornamento dati: {e}")
             raise UpdateFailed(f"Errore aggiornamento Better Calendar: {e}")
 
-    async def _save_events_to_file(self, all_events: Dict[str, List[Dict[str, Any]]], calendar_entities: Dict[str, Any]) -> None:
-        """Salva tutti gli eventi in un file JSON."""
+    async def _async_save_snapshot(self, now: datetime) -> None:
+        """Salva gli eventi correnti (SENZA notifiche, gestite separatamente) solo se il contenuto è cambiato.
+
+        Gli eventi provvisori delle scritture ottimistiche non vengono salvati:
+        esistono solo finché il calendario non li conferma.
+        """
         try:
-            # Prepara i dati da salvare
-            data_to_save = {
-                "last_update": dt_util.utcnow().isoformat(),
-                "calendars": calendar_entities,
-                "events": all_events,
-                "total_events": sum(len(events) for events in all_events.values()),
+            events = {
+                calendar_id: [
+                    event for event in events if not str(event.get("uid", "")).startswith(PROVISIONAL_UID_PREFIX)
+                ]
+                for calendar_id, events in (self.data or {}).items()
             }
+            fingerprints = {
+                calendar_id: {
+                    key: fingerprint
+                    for key, fingerprint in calendar_fingerprints.items()
+                    if not key.startswith(PROVISIONAL_UID_PREFIX)
+                }
+                for calendar_id, calendar_fingerprints in self._fingerprints.items()
+            }
+            written = await self._snapshot_writer.async_write(
+                events,
+                snapshot_hash(fingerprints),
+                now.isoformat(),
+            )
+            if written:
+                _LOGGER.debug(f"✅ Eventi salvati in: {self._events_store.path}")
+                
+        except Exception as e:
+            _LOGGER.error(f"❌ Errore salvando eventi: {e}")
+
+    def _apply_deltas(
+        self, fetched_events: Dict[str, List[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, CalendarDelta]]:
+        """Calcola i delta per calendario riusando le liste dei calendari invariati."""
+        previous_data = self.data or {}
+        all_events: Dict[str, List[Dict[str, Any]]] = {}
+        deltas: Dict[str, CalendarDelta] = {}
+        
+        for calendar_id, events in fetched_events.items():
+            previous_events = previous_data.get(calendar_id)
+            if events is previous_events and calendar_id in self._fingerprints:
+                # Dati mantenuti dopo un errore/timeout: nulla da confrontare
+                all_events[calendar_id] = previous_events
+                continue
             
-            # Salva in modo asincrono
-            def _write_file():
-                with open(self.events_file, 'w', encoding='utf-8') as f:
-                    json.dump(data_to_save, f, ensure_ascii=False, indent=2, default=str)
+            delta, fingerprints = diff_calendar_events(
+                calendar_id, self._fingerprints.get(calendar_id), events
+            )
+            self._fingerprints[calendar_id] = fingerprints
             
-            await self.hass.async_add_executor_job(_write_file)
-    
+            if delta.has_changes or previous_events is None:
+                all_events[calendar_id] = events
+                deltas[calendar_id] = delta
+                self._records_by_calendar[calendar_id] = self._build_records(calendar_id, events)
+            else:
+                all_events[calendar_id] = previous_events
+        
+        # Calendari non più selezionati: tutti i loro eventi risultano rimossi
+        for calendar_id in list(self._fingerprints):
+            if calendar_id not in fetched_events:
+                delta = CalendarDelta(calendar_id)
+                delta.removed = list(self._fingerprints.pop(calendar_id))
+                deltas[calendar_id] = delta
+                self._records_by_calendar.pop(calendar_id, None)
+        
+        if deltas:
+            # Indice a intervalli ricostruito una volta per sincronizzazione, poi pubblicato in blocco
+            self.snapshot = self._build_snapshot(
+                record for records in self._records_by_calendar.values() for record in records
+            )
+        
+        return all_events, deltas
+
+    def _build_snapshot(
+        self, records: Iterable[EventRecord], window: Optional[Tuple[date, date]] = None
+    ) -> EventSnapshot:
+        """Costruisce il nuovo snapshot immutabile (generazione successiva)."""
+        index = EventIndex(records)
+        return EventSnapshot(
+            self.snapshot.generation + 1,
+            index,
+            self._build_day_buckets(index.records, window or self._window),
+            dt_util.utcnow(),
+        )
+
+    def _build_warm_state(
+        self, stored: Dict[str, Any]
+    ) -> Tuple[
+        Dict[str, List[Dict[str, Any]]],
+        Dict[str, Dict[str, str]],
+        Dict[str, List[EventRecord]],
+        EventSnapshot,
+    ]:
+        """Ricostruisce eventi, impronte, record e snapshot dall'ultimo salvataggio (nell'executor).
+
+        Con le impronte già note il primo aggiornamento segnala solo le modifiche reali.
+        """
+        events = {
+            calendar_id: calendar_events
+            for calendar_id, calendar_events in stored.get("events", {}).items()
+            if not self.calendar_entities or calendar_id in self.calendar_entities
+        }
+        fingerprints = {
+            calendar_id: diff_calendar_events(calendar_id, None, calendar_events)[1]
+            for calendar_id, calendar_events in events.items()
+        }
+        records_by_calendar = {
+            calendar_id: self._build_records(calendar_id, calendar_events)
+            for calendar_id, calendar_events in events.items()
+        }
+        snapshot = self._build_snapshot(
+            (record for records in records_by_calendar.values() for record in records),
+            self._get_fetch_windows(dt_util.now().date())[1],
+        )
+        return events, fingerprints, records_by_calendar, snapshot
+
+    @callback
+    def _publish_warm_state(
+        self,
+        events: Dict[str, List[Dict[str, Any]]],
+        fingerprints: Dict[str, Dict[str, str]],
+        records_by_calendar: Dict[str, List[EventRecord]],
+        snapshot: EventSnapshot,
+    ) -> None:
+        """Pubblica lo stato ricostruito dal salvataggio come dati correnti."""
+        self._fingerprints = fingerprints
+        self._records_by_calendar = records_by_calendar
+        self.snapshot = snapshot
+        self.data = events
+
+    def _build_day_buckets(
+        self, records: List[EventRecord], window: Optional[Tuple[date, date]]
+    ) -> Dict[date, Tuple[EventRecord, ...]]:
+        """Raggruppa i record per giorno locale all'interno della finestra di sincronizzazione."""
+        buckets: Dict[date, List[EventRecord]] = {}
+        window_start, window_end = window or (date.min, date.max)
+        
+        # I record sono ordinati per inizio, quindi anche ogni giorno lo è
+        for record in records:
+            first_day = max(record.local_date, window_start)
+            # La fine è esclusiva: un evento che termina a mezzanotte non tocca il giorno dopo
+            last_ts = max(record.start_ts, record.end_ts - 1)
+            last_day = min(dt_util.as_local(dt_util.utc_from_timestamp(last_ts)).date(), window_end)
             
-        except Exception as err:
-            _LOGGER.error(f"Better Calendar: Errore nel salvare gli eventi nel file: {err}")
+            day = first_day
+            while day <= last_day:
+                buckets.setdefault(day, []).append(record)
+                day += timedelta(days=1)
+        
+        return {day: tuple(day_records) for day, day_records in buckets.items()}
+
+    def _build_records(self, calendar_id: str, events: List[Dict[str, Any]]) -> List[EventRecord]:
+        """Converte gli eventi di un calendario in record con orari già calcolati."""
+        records = []
+        for event in events:
+            record = EventRecord.from_event(calendar_id, event)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def _get_fetch_windows(self, today: date) -> Tuple[Tuple[date, date], Tuple[date, date]]:
+        """Finestre vicina e lontana (fine esclusa) dalle opzioni; la lontana contiene sempre la vicina."""
+        near_past = self._get_option("near_past_days", DEFAULT_NEAR_PAST_DAYS)
+        near_future = self._get_option("near_future_days", DEFAULT_NEAR_FUTURE_DAYS)
+        far_past = max(self._get_option("far_past_days", DEFAULT_FAR_PAST_DAYS), near_past)
+        far_future = max(self._get_option("far_future_days", DEFAULT_FAR_FUTURE_DAYS), near_future)
+        return (
+            (today - timedelta(days=near_past), today + timedelta(days=near_future)),
+            (today - timedelta(days=far_past), today + timedelta(days=far_future)),
+        )
+
+    async def _async_fetch_calendar_tiered(
+        self, entity_id: str, fetch_timeout: int, now: datetime, full: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Scarica la finestra vicina; l'intera finestra lontana solo se scaduta o richiesta."""
+        (near_start, near_end), (far_start, far_end) = self._get_fetch_windows(now.date())
+        now_ts = now.timestamp()
+        far_fetched_at = self._far_fetched_at.get(entity_id)
+        
+        if (
+            full
+            or far_fetched_at is None
+            or now_ts - far_fetched_at >= FAR_WINDOW_REFRESH_HOURS * 3600
+            or entity_id not in self._records_by_calendar
+        ):
+            events = await self._async_fetch_calendar(entity_id, far_start, far_end, fetch_timeout)
+            if entity_id not in self._failed_fetches:
+                self._far_fetched_at[entity_id] = now_ts
+            return events
+        
+        events = await self._async_fetch_calendar(entity_id, near_start, near_end, fetch_timeout)
+        if entity_id in self._failed_fetches:
+            return events
+        
+        # Eventi già noti fuori dalla finestra vicina + quelli appena scaricati che la toccano
+        near_start_ts = dt_util.start_of_local_day(near_start).timestamp()
+        near_end_ts = dt_util.start_of_local_day(near_end).timestamp()
+        kept = [
+            record.event
+            for record in self._records_by_calendar[entity_id]
+            if not (
+                record.start_ts < near_end_ts
+                and (record.end_ts > near_start_ts or record.start_ts >= near_start_ts)
+            )
+        ]
+        return kept + events
 
-    async def _load_cached_data(self) -> Dict[str, Any]:
-        """Carica i dati dalla cache (file JSON)."""
+    async def _async_fetch_calendar(self, entity_id: str, start_date, end_date, fetch_timeout: int) -> List[Dict[str, Any]]:
+        """Scarica e normalizza gli eventi di un singolo calendario."""
+        # In caso di errore o timeout mantieni gli ultimi eventi noti del calendario
+        previous_events = (self.data or {}).get(entity_id, [])
+        
+        # Verifica che il calendario esista
+        if self.hass.states.get(entity_id) is None:
+            return []
+        
+        calendar_entity = self._get_calendar_entity(entity_id)
+        
         try:
-            if not os.path.exists(self.events_file):
-
-                return {
-                    "calendars": {},
-                    "events": {},
-                    "last_update": dt_util.utcnow(),
-                    "events_file": self.events_file,
-                    "total_events": 0,
-                }
-            
-            def _read_file():
-                with open(self.events_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            
-            cached_data = await self.hass.async_add_executor_job(_read_file)
+            async with asyncio.timeout(fetch_timeout):
+                if calendar_entity is not None:
+                    # Chiamata diretta all'entità: CalendarEvent con datetime veri, senza passare dal bus dei servizi
+                    calendar_events = await calendar_entity.async_get_events(
+                        self.hass,
+                        dt_util.start_of_local_day(start_date),
+                        dt_util.start_of_local_day(end_date),
+                    )
+                    return self._convert_calendar_events(entity_id, calendar_events)
+                
+                # Fallback: entità non risolvibile, usa il servizio get_events
+                response = await self.hass.services.async_call(
+                    "calendar",
+                    "get_events",
+                    {
+                        "entity_id": entity_id,
+                        "start_date_time": start_date.isoformat(),
+                        "end_date_time": end_date.isoformat(),
+                    },
+                    blocking=True,
+                    return_response=True,
+                )
+        except TimeoutError:
+            _LOGGER.warning(f"⏱️ Timeout ({fetch_timeout}s) recuperando eventi da {entity_id}, uso gli ultimi dati noti")
+            self._failed_fetches.add(entity_id)
+            return previous_events
+        except Exception as e:
+            _LOGGER.error(f"❌ Errore recuperando eventi da {entity_id}: {e}")
+            self._failed_fetches.add(entity_id)
+            return previous_events
+        
+        calendar_events = response.get(entity_id, {}).get("events", [])
+        
+        # Processa e filtra gli eventi
+        processed_events = []
+        
+        for event in calendar_events:
+            try:
+                normalized_event = self._normalize_event(entity_id, event)
+                if normalized_event is not None:
+                    processed_events.append(normalized_event)
+                
+            except Exception as e:
+                _LOGGER.warning(f"⚠️ Errore processando evento: {e}")
+                continue
+        
+        return processed_events
 
-            # Fa il merge delle notifiche dal file separato
-            merged_data = self.merge_notifications_into_events(cached_data)
-            
+    def _get_calendar_entity(self, entity_id: str) -> Optional[CalendarEntity]:
+        """Risolve l'entità calendario tramite l'EntityComponent della piattaforma calendar."""
+        component = self.hass.data.get(CALENDAR_DOMAIN)
+        if component is None or not hasattr(component, "get_entity"):
+            return None
+        return component.get_entity(entity_id)
+
+    def _convert_calendar_events(
+        self, entity_id: str, calendar_events: List[CalendarEvent]
+    ) -> List[Dict[str, Any]]:
+        """Converte i CalendarEvent nel formato normalizzato senza passare da stringhe da rileggere."""
+        processed_events = []
+        
+        for calendar_event in calendar_events:
+            try:
+                if not calendar_event.summary:
+                    continue
+                
+                event = self._format_event_times(calendar_event.start, calendar_event.end)
+                event.update({
+                    "summary": calendar_event.summary,
+                    "description": calendar_event.description,
+                    "location": calendar_event.location,
+                    "uid": calendar_event.uid,
+                    "recurrence_id": calendar_event.recurrence_id,
+                    "rrule": calendar_event.rrule,
+                })
+                processed_events.append(self._finalize_event(entity_id, event))
+                
+            except Exception as e:
+                _LOGGER.warning(f"⚠️ Errore processando evento: {e}")
+                continue
+        
+        return processed_events
+
+    @staticmethod
+    def _format_event_times(start: Any, end: Any) -> Dict[str, Any]:
+        """Inizio e fine nel formato normalizzato a partire da date o datetime."""
+        if isinstance(start, datetime):
+            # Evento con orario - resetta i secondi
             return {
-                "calendars": merged_data.get("calendars", {}),
-                "events": merged_data.get("events", {}),
-                "last_update": merged_data.get("last_update", dt_util.utcnow().isoformat()),
-                "events_file": self.events_file,
-                "total_events": merged_data.get("total_events", 0),
+                "allDay": False,
+                "start": {"dateTime": dt_util.as_local(start).replace(second=0, microsecond=0).isoformat()},
+                "end": {"dateTime": dt_util.as_local(end).replace(second=0, microsecond=0).isoformat()},
             }
+        # Evento tutto il giorno
+        return {
+            "allDay": True,
+            "start": {"date": start.isoformat()},
+            "end": {"date": end.isoformat()},
+        }
+
+    def _normalize_event(self, entity_id: str, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Normalizza un evento restituito da calendar.get_events."""
+        # Assicurati che l'evento abbia i campi necessari
+        if not event.get("summary"):
+            return None
             
-        except Exception as err:
-            _LOGGER.error(f"Better Calendar: Errore nel caricare i dati dalla cache: {err}")
-            return {
-                "calendars": {},
-                "events": {},
-                "last_update": dt_util.utcnow(),
-                "events_file": self.events_file,
-                "total_events": 0,
-            }
+        # Normalizza le date
+        event_start = event.get("start")
+        event_end = event.get("end")
+        
+        if not event_start or not event_end:
+            return None
+        
+        # Gestisci eventi tutto il giorno vs con orario
+        if isinstance(event_start, str) and "T" not in event_start:
+            # Evento tutto il giorno
+            event["allDay"] = True
+            event["start"] = {"date": event_start}
+            event["end"] = {"date": event_end}
+        else:
+            # Evento con orario - resetta i secondi
+            event["allDay"] = False
+            if isinstance(event_start, str):
+                # Converti in datetime, resetta secondi e riconverti in stringa
+                start_dt = datetime.fromisoformat(event_start.replace('Z', '+00:00'))
+                start_no_seconds = start_dt.replace(second=0, microsecond=0)
+                event["start"] = {"dateTime": start_no_seconds.isoformat()}
+            if isinstance(event_end, str):
+                # Stessa cosa per l'orario di fine
+                end_dt = datetime.fromisoformat(event_end.replace('Z', '+00:00'))
+                end_no_seconds = end_dt.replace(second=0, microsecond=0)
+                event["end"] = {"dateTime": end_no_seconds.isoformat()}
+        
+        return self._finalize_event(entity_id, event)
+
+    def _finalize_event(self, entity_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Completa un evento con date già normalizzate (uid e notifiche)."""
+        # Preserva l'ID originale di Google Calendar se disponibile
+        original_id = event.get("uid")
+        if original_id:
+            # Salva l'ID originale di Google Calendar
+            event["google_calendar_id"] = original_id
+            # Mantieni anche l'ID originale come UID principale
+            event["uid"] = original_id
+        else:
+            # Se non c'è un ID originale, genera uno con hash
+            event["uid"] = f"{entity_id}_{hash(str(event))}"
+            
+        # Inizializza le notifiche come array vuoto (ora gestite separatamente)
+        event["notifications"] = []
+        
+        return event
 
     def _get_calendar_entities(self) -> Dict[str, Any]:
         """Ottieni le entità calendario selezionate."""
         calendar_entities = {}
         
         # Ottieni i calendari selezionati dalla configurazione
-        selected_calendars = self.config.get("selected_calendars", [])
+        selected_calendars = self._get_option("selected_calendars", [])
         
         # Debug dei calendari (solo se necessario)
         all_available_calendars = self.hass.states.async_entity_ids("calendar")
@@ -446,76 +981,43 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
             _LOGGER.error(f"Better Calendar: Errore nel recupero eventi per {entity_id}: {err}")
             return []
 
-    # Metodi per i sensori che leggono dal file JSON
-    async def get_events_from_file(self) -> Dict[str, Any]:
-        """Carica gli eventi dal file JSON per i sensori."""
-        return await self._load_cached_data()
+    @callback
+    def events_on_day(self, day: date) -> Tuple[EventRecord, ...]:
+        """Restituisce i record degli eventi che toccano un giorno locale."""
+        return self.snapshot.events_on_day(day)
+
+    @callback
+    def events_between(self, start: datetime, end: datetime) -> List[EventRecord]:
+        """Restituisce i record degli eventi che toccano l'intervallo [start, end)."""
+        return self.snapshot.index.overlapping(start.timestamp(), end.timestamp())
 
+    @callback
     def get_events_for_date(self, target_date: datetime) -> List[Dict[str, Any]]:
-        """Ottieni eventi per una data specifica dal file JSON."""
+        """Ottieni eventi per una data specifica (inclusi quelli su più giorni)."""
         try:
-            if not os.path.exists(self.events_file):
-                return []
+            day_start = dt_util.start_of_local_day(target_date.date())
+            day_end = dt_util.start_of_local_day(target_date.date() + timedelta(days=1))
             
-            with open(self.events_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            events_for_date = []
-            target_date_str = target_date.date().isoformat()
-            
-            for calendar_id, events in data.get("events", {}).items():
-                for event in events:
-                    # Controlla se l'evento è nella data target
-                    start_info = event.get("start", {})
-                    
-                    # Gestisci eventi all-day
-                    if "date" in start_info:
-                        event_date = start_info["date"]
-                        if event_date == target_date_str:
-                            events_for_date.append(event)
-                    # Gestisci eventi con orario
-                    elif "dateTime" in start_info:
-                        event_datetime = datetime.fromisoformat(start_info["dateTime"].replace("Z", "+00:00"))
-                        if event_datetime.date().isoformat() == target_date_str:
-                            events_for_date.append(event)
-            
-            return events_for_date
+            return [
+                record.event
+                for record in self.snapshot.index.overlapping(day_start.timestamp(), day_end.timestamp())
+            ]
             
         except Exception as err:
             _LOGGER.error(f"Better Calendar: Errore nel leggere eventi per data {target_date}: {err}")
             return []
 
+    @callback
     def get_events_for_period(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
-        """Ottieni eventi per un periodo specifico dal file JSON."""
+        """Ottieni eventi che toccano un periodo specifico (giorni estremi inclusi)."""
         try:
-            if not os.path.exists(self.events_file):
-                return []
-            
-            with open(self.events_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            period_start = dt_util.start_of_local_day(start_date.date())
+            period_end = dt_util.start_of_local_day(end_date.date() + timedelta(days=1))
             
-            events_for_period = []
-            start_date_str = start_date.date().isoformat()
-            end_date_str = end_date.date().isoformat()
-            
-            for calendar_id, events in data.get("events", {}).items():
-                for event in events:
-                    # Controlla se l'evento è nel periodo
-                    start_info = event.get("start", {})
-                    
-                    # Gestisci eventi all-day
-                    if "date" in start_info:
-                        event_date = start_info["date"]
-                        if start_date_str <= event_date <= end_date_str:
-                            events_for_period.append(event)
-                    # Gestisci eventi con orario
-                    elif "dateTime" in start_info:
-                        event_datetime = datetime.fromisoformat(start_info["dateTime"].replace("Z", "+00:00"))
-                        event_date_str = event_datetime.date().isoformat()
-                        if start_date_str <= event_date_str <= end_date_str:
-                            events_for_period.append(event)
-            
-            return events_for_period
+            return [
+                record.event
+                for record in self.snapshot.index.overlapping(period_start.timestamp(), period_end.timestamp())
+            ]
             
         except Exception as err:
             _LOGGER.error(f"Better Calendar: Errore nel leggere eventi per periodo {start_date} - {end_date}: {err}")
@@ -524,25 +1026,21 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
     @callback
     def get_events_for_calendar(self, calendar_id: str) -> List[Dict[str, Any]]:
         """Ottieni eventi per un calendario specifico."""
-        if self.data and "events" in self.data:
-            return self.data["events"].get(calendar_id, [])
+        if self.data:
+            return self.data.get(calendar_id, [])
         return []
 
     @callback
     def get_all_events(self) -> List[Dict[str, Any]]:
         """Ottieni tutti gli eventi."""
-        all_events = []
-        if self.data and "events" in self.data:
-            for events in self.data["events"].values():
-                all_events.extend(events)
-        return all_events
+        return [record.event for record in self.snapshot.records]
 
     @callback
     def get_upcoming_events(self, days: int = 7) -> List[Dict[str, Any]]:
-        """Ottieni eventi futuri entro X giorni."""
+        """Ottieni eventi in corso o futuri entro X giorni."""
         now = dt_util.utcnow()
         end_date = now + timedelta(days=days)
-        return self.get_events_for_period(now, end_date)
+        return [record.event for record in self.snapshot.index.overlapping(now.timestamp(), end_date.timestamp())]
 
     def _get_event_start_datetime(self, event: Dict[str, Any]) -> datetime:
         """Ottieni la data/ora di inizio dell'evento."""
@@ -558,17 +1056,14 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
     async def force_update_now(self) -> Dict[str, Any]:
         """Forza un aggiornamento immediato dei dati."""
         try:
-    
-            
-            # Forza l'aggiornamento
-            data = await self._async_update_data()
+            # Forza l'aggiornamento passando dal coordinator: dati, delta e listener restano allineati
+            await self.async_refresh()
             
             result = {
-                "update_result": data,
-                "success": True
+                "update_result": self.data,
+                "success": self.last_update_success
             }
             
-
             return result
             
         except Exception as err:
@@ -587,55 +1082,116 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
     
 
     
+    def _get_notifications_sensor(self):
+        """Restituisce il sensore BetterCalendarNotifications di questa entry."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.entry_id, {})
+        return entry_data.get("notifications_sensor") if isinstance(entry_data, dict) else None
+
+    @callback
     def get_notifications_for_event(self, event_id: str) -> List[Dict]:
-        """Ottiene le notifiche per un evento dal file events."""
-        try:
-            if not os.path.exists(self.events_file):
-                return []
-            
-            def _read_events_file():
-                with open(self.events_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            
-            events_data = _read_events_file()
-            
-            # Cerca l'evento e le sue notifiche
-            for calendar_id, events in events_data.get("events", {}).items():
-                for event in events:
-                    if event.get("uid") == event_id:
-                        return event.get("notifications", [])
-            
-            return []
-            
-        except Exception as e:
+        """Ottiene le notifiche di un evento."""
+        notifications_sensor = self._get_notifications_sensor()
+        if notifications_sensor is None:
             return []
+        return notifications_sensor.get_notifications_for_event(event_id)
     
+    @callback
     def get_all_notifications(self) -> Dict[str, Dict]:
-        """Ottiene tutte le notifiche dal file events."""
-        try:
-            if not os.path.exists(self.events_file):
-                return {}
-            
-            def _read_events_file():
-                with open(self.events_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            
-            events_data = _read_events_file()
-            
-            # Estrai tutte le notifiche
-            all_notifications = {}
-            for calendar_id, events in events_data.get("events", {}).items():
-                for event in events:
-                    event_notifications = event.get("notifications", [])
-                    for notification in event_notifications:
-                        notif_id = notification.get("id")
-                        if notif_id:
-                            all_notifications[notif_id] = notification
-            
-            return all_notifications
-            
-        except Exception as e:
+        """Ottiene tutte le notifiche."""
+        notifications_sensor = self._get_notifications_sensor()
+        if notifications_sensor is None:
             return {}
+        return notifications_sensor.get_notifications_data()
+
+    @staticmethod
+    def _parse_event_times(event_data: Dict[str, Any]) -> Tuple[Any, Any]:
+        """Inizio e fine dei dati di un servizio: date per gli eventi tutto il giorno, altrimenti datetime locali."""
+        start_datetime = event_data["start_datetime"]
+        end_datetime = event_data["end_datetime"]
+        if isinstance(start_datetime, date) and isinstance(end_datetime, date):
+            # Già convertiti (es. importazione .ics)
+            return start_datetime, end_datetime
+        if event_data.get("all_day", False):
+            return date.fromisoformat(start_datetime[:10]), date.fromisoformat(end_datetime[:10])
+        start = dt_util.parse_datetime(start_datetime)
+        end = dt_util.parse_datetime(end_datetime)
+        if start is None or end is None:
+            raise ValueError(f"Data non valida: {start_datetime} - {end_datetime}")
+        # Senza fuso orario valgono come ora locale
+        return dt_util.as_local(start), dt_util.as_local(end)
+
+    def _build_local_event(self, calendar_id: str, uid: str, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Evento normalizzato per la scrittura ottimistica nello snapshot."""
+        event = self._format_event_times(*self._parse_event_times(event_data))
+        event.update({
+            "summary": event_data["summary"],
+            "description": event_data.get("description", ""),
+            "uid": uid,
+        })
+        return self._finalize_event(calendar_id, event)
+
+    def _find_event(
+        self, uid: str, recurrence_id: Optional[str] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Cerca un evento per uid (e occorrenza) negli eventi correnti (calendario, evento).
+
+        Senza recurrence_id un evento ricorrente non è univoco: nessun risultato,
+        per non modificare o eliminare l'intera serie.
+        """
+        for calendar_id, events in (self.data or {}).items():
+            matches = [event for event in events if event.get("uid") == uid]
+            if not matches:
+                continue
+            if recurrence_id is not None:
+                matches = [event for event in matches if event.get("recurrence_id") == recurrence_id]
+            elif len(matches) > 1 or matches[0].get("recurrence_id") or matches[0].get("rrule"):
+                _LOGGER.warning(f"⚠️ {uid} è un evento ricorrente: serve il recurrence_id dell'occorrenza")
+                return None
+            if matches:
+                return calendar_id, matches[0]
+        return None
+
+    @callback
+    def _apply_local_change(
+        self,
+        calendar_id: str,
+        upsert: Optional[Dict[str, Any]] = None,
+        remove_keys: Iterable[str] = (),
+    ) -> None:
+        """Applica subito una modifica allo snapshot in memoria (scrittura ottimistica).
+
+        Sensori e card la vedono immediatamente; il riscaricamento mirato del
+        calendario la conferma o la corregge. Non viene salvata su disco.
+        """
+        if self.data is None:
+            return
+        remove_keys = set(remove_keys)
+        events = [event for event in self.data.get(calendar_id, []) if event_key(event) not in remove_keys]
+        if upsert is not None:
+            events.append(upsert)
+        
+        all_events, deltas = self._apply_deltas({**self.data, calendar_id: events})
+        if not deltas:
+            return
+        # Stesso ordine degli aggiornamenti: generazione (già incrementata), delta, listener
+        self.last_deltas = deltas
+        self.data = all_events
+        self.async_update_listeners()
+
+    async def _async_refresh_after_write(self, calendar_id: str) -> None:
+        """Riscarica solo il calendario scritto (condiviso con le altre modifiche ravvicinate)."""
+        self._written_calendars.add(calendar_id)
+        await self._write_refresh.async_request()
+
+    def _get_writable_entity(
+        self, calendar_id: str, feature: CalendarEntityFeature
+    ) -> Optional[CalendarEntity]:
+        """Entità calendario se supporta l'operazione richiesta."""
+        entity = self._get_calendar_entity(calendar_id)
+        if entity is None or not (entity.supported_features or 0) & feature:
+            _LOGGER.warning(f"⚠️ {calendar_id} non supporta questa modifica degli eventi")
+            return None
+        return entity
 
     async def create_event(self, event_data: Dict[str, Any]) -> str:
         """Crea un nuovo evento."""
@@ -650,7 +1206,7 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
             notification_time = event_data.get("notification_time")
             
             # Genera un ID evento unico
-            event_id = f"better_calendar_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(summary)}"
+            event_id = f"{PROVISIONAL_UID_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(summary)}"
             
             # Prepara l'evento per il calendario principale
             if self.calendar_entities:
@@ -673,20 +1229,32 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
                     event_service_data["dtstart"] = start_datetime
                     event_service_data["dtend"] = end_datetime
                 
-                # Chiama il servizio per creare l'evento
-                await self.hass.services.async_call(
-                    "calendar",
-                    "create_event",
-                    {
-                        "entity_id": main_calendar,
-                        "event": event_service_data
-                    }
-                )
+                # Scrittura ottimistica: l'evento compare subito con un uid provvisorio.
+                # Se le date non si interpretano qui la scrittura vera si fa comunque:
+                # l'evento comparirà con il riscaricamento
+                try:
+                    self._apply_local_change(
+                        main_calendar, upsert=self._build_local_event(main_calendar, event_id, event_data)
+                    )
+                except Exception as e:
+                    _LOGGER.debug(f"Scrittura ottimistica saltata per '{summary}': {e}")
                 
-                            # Gestione notifiche ora delegata al sensore BetterCalendarNotifications
+                try:
+                    # Chiama il servizio per creare l'evento
+                    await self.hass.services.async_call(
+                        "calendar",
+                        "create_event",
+                        {
+                            "entity_id": main_calendar,
+                            "event": event_service_data
+                        }
+                    )
+                finally:
+                    # Riscarica solo il calendario principale: sostituisce l'evento provvisorio
+                    # con quello reale o lo toglie se la scrittura è fallita
+                    await self._async_refresh_after_write(main_calendar)
                 
-                # Forza aggiornamento dati
-                await self.async_refresh()
+                            # Gestione notifiche ora delegata al sensore BetterCalendarNotifications
                 
                 return event_id
                 
@@ -694,26 +1262,175 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
             _LOGGER.error(f"❌ Errore creando evento: {e}")
             raise
 
+    async def async_create_events(
+        self, events: List[Dict[str, Any]], refresh: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Crea più eventi in parallelo (con un limite) e riscarica i calendari coinvolti una sola volta.
+
+        Ogni evento può indicare il calendario di destinazione ("calendar"),
+        altrimenti va nel calendario principale. Restituisce l'esito di ogni evento.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_EVENT_WRITES)
+        entities: Dict[str, Optional[CalendarEntity]] = {}
+        
+        async def _create(index: int, event_data: Dict[str, Any]) -> Dict[str, Any]:
+            calendar_id = event_data.get("calendar") or (self.calendar_entities[0] if self.calendar_entities else None)
+            result = {"index": index, "calendar": calendar_id, "summary": event_data.get("summary"), "success": False}
+            if calendar_id is None:
+                result["error"] = "Nessun calendario disponibile"
+                return result
+            
+            if calendar_id not in entities:
+                entities[calendar_id] = self._get_writable_entity(calendar_id, CalendarEntityFeature.CREATE_EVENT)
+            entity = entities[calendar_id]
+            if entity is None:
+                result["error"] = "Il calendario non supporta la creazione di eventi"
+                return result
+            
+            try:
+                start, end = self._parse_event_times(event_data)
+                kwargs = {
+                    "summary": event_data["summary"],
+                    "dtstart": start,
+                    "dtend": end,
+                }
+                for key in ("description", "location", "rrule", "uid"):
+                    if event_data.get(key):
+                        kwargs[key] = event_data[key]
+                
+                async with semaphore:
+                    await entity.async_create_event(**kwargs)
+                result["success"] = True
+            except Exception as e:
+                result["error"] = str(e)
+            return result
+        
+        results = list(await asyncio.gather(*(_create(index, event_data) for index, event_data in enumerate(events))))
+        
+        # Un solo aggiornamento, solo dei calendari scritti e sincronizzati da Better Calendar
+        written = {
+            result["calendar"] for result in results
+            if result["success"] and result["calendar"] in self.calendar_entities
+        }
+        if written and refresh:
+            self._written_calendars.update(written)
+            await self._write_refresh.async_request()
+        
+        created = sum(1 for result in results if result["success"])
+        _LOGGER.debug(f"✅ Creati {created}/{len(results)} eventi in {sorted(written)}")
+        return results
+
+    async def async_import_ics(self, path: str, calendar_id: str, batch_size: int) -> Dict[str, Any]:
+        """Importa un file .ics nel calendario indicato, a blocchi e senza caricarlo tutto in memoria.
+
+        Gli eventi con un uid già presente nel calendario (nella finestra
+        sincronizzata) o già visto nel file vengono saltati; quelli non validi
+        (senza titolo o senza durata) sono contati in "invalid" e descritti in
+        "errors" insieme alle creazioni fallite. L'avanzamento è pubblicato con
+        l'evento better_calendar_import_progress.
+        """
+        if self._get_writable_entity(calendar_id, CalendarEntityFeature.CREATE_EVENT) is None:
+            raise ValueError(f"{calendar_id} non supporta la creazione di eventi")
+        
+        known_uids = {
+            event["uid"] for event in (self.data or {}).get(calendar_id, []) if event.get("uid")
+        }
+        stats = {
+            "calendar": calendar_id,
+            "path": path,
+            "parsed": 0,
+            "created": 0,
+            "skipped": 0,
+            "invalid": 0,
+            "failed": 0,
+        }
+        errors: List[str] = []
+        started = time.monotonic()
+        
+        events = iter_ics_events(path)
+        try:
+            while True:
+                batch = await self.hass.async_add_executor_job(next_batch, events, batch_size)
+                if not batch:
+                    break
+                
+                to_create = []
+                for event, error in batch:
+                    stats["parsed"] += 1
+                    if error is not None:
+                        stats["invalid"] += 1
+                        errors.append(error)
+                        continue
+                    uid = event.get("uid")
+                    if uid and uid in known_uids:
+                        stats["skipped"] += 1
+                        continue
+                    if uid:
+                        known_uids.add(uid)
+                    event["calendar"] = calendar_id
+                    to_create.append(event)
+                
+                if to_create:
+                    results = await self.async_create_events(to_create, refresh=False)
+                    created = sum(1 for result in results if result["success"])
+                    stats["created"] += created
+                    stats["failed"] += len(results) - created
+                    errors.extend(
+                        f"{result['summary']}: {result.get('error')}" for result in results if not result["success"]
+                    )
+                
+                self.hass.bus.async_fire(f"{DOMAIN}_import_progress", dict(stats))
+        finally:
+            await self.hass.async_add_executor_job(events.close)
+        
+        # Un solo aggiornamento alla fine (solo se il calendario è sincronizzato da Better Calendar)
+        if stats["created"] and calendar_id in self.calendar_entities:
+            self._written_calendars.add(calendar_id)
+            await self._write_refresh.async_request()
+        
+        stats["errors"] = errors[:IMPORT_MAX_REPORTED_ERRORS]
+        stats["duration_seconds"] = round(time.monotonic() - started, 1)
+        _LOGGER.info(
+            f"📥 Importazione di {path} in {calendar_id}: {stats['created']} creati, "
+            f"{stats['skipped']} già presenti, {stats['invalid']} non validi, "
+            f"{stats['failed']} falliti in {stats['duration_seconds']}s"
+        )
+        return stats
+
     async def update_event(self, event_data: Dict[str, Any]) -> bool:
-        """Aggiorna un evento esistente."""
+        """Aggiorna un evento esistente (una sola occorrenza se ricorrente)."""
         try:
             event_id = event_data["event_id"]
             summary = event_data["summary"]
             description = event_data.get("description", "")
-            start_datetime = event_data["start_datetime"]
-            end_datetime = event_data["end_datetime"]
-            all_day = event_data.get("all_day", False)
-            has_notification = event_data.get("has_notification", False)
-            notification_time = event_data.get("notification_time")
             
-            # Per ora, simuliamo l'aggiornamento eliminando e ricreando l'evento
-            # Questo è un approccio semplificato - in una implementazione più complessa
-            # dovresti cercare l'evento esistente e aggiornarlo direttamente
+            found = self._find_event(event_id, event_data.get("recurrence_id"))
+            if found is None:
+                return False
+            calendar_id, current_event = found
             
-            # Gestione notifiche ora delegata al sensore BetterCalendarNotifications
+            entity = self._get_writable_entity(calendar_id, CalendarEntityFeature.UPDATE_EVENT)
+            if entity is None:
+                return False
             
-            # Forza aggiornamento dati
-            await self.async_refresh()
+            start, end = self._parse_event_times(event_data)
+            updated_event = self._build_local_event(calendar_id, event_id, event_data)
+            updated_event["recurrence_id"] = current_event.get("recurrence_id")
+            
+            # Scrittura ottimistica: l'evento modificato sostituisce subito quello vecchio
+            self._apply_local_change(calendar_id, upsert=updated_event, remove_keys=[event_key(current_event)])
+            
+            try:
+                await entity.async_update_event(
+                    event_id,
+                    {"summary": summary, "description": description, "dtstart": start, "dtend": end},
+                    recurrence_id=current_event.get("recurrence_id"),
+                )
+            finally:
+                # Riscarica solo il calendario dell'evento: conferma o annulla la modifica ottimistica
+                await self._async_refresh_after_write(calendar_id)
+            
+            # Gestione notifiche ora delegata al sensore BetterCalendarNotifications
             
             return True
             
@@ -721,17 +1438,28 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
             _LOGGER.error(f"❌ Errore aggiornando evento: {e}")
             return False
 
-    async def delete_event(self, event_id: str) -> bool:
-        """Elimina un evento."""
+    async def delete_event(self, event_id: str, recurrence_id: Optional[str] = None) -> bool:
+        """Elimina un evento (una sola occorrenza se ricorrente)."""
         try:
-            # Gestione notifiche ora delegata al sensore BetterCalendarNotifications
+            found = self._find_event(event_id, recurrence_id)
+            if found is None:
+                return False
+            calendar_id, current_event = found
             
-            # Per l'eliminazione diretta dal calendario HA, avremmo bisogno dell'UID
-            # Per ora gestiamo solo la rimozione delle notifiche
-            # In una implementazione completa, dovresti trovare e eliminare l'evento dal calendario
+            entity = self._get_writable_entity(calendar_id, CalendarEntityFeature.DELETE_EVENT)
+            if entity is None:
+                return False
             
-            # Forza aggiornamento dati
-            await self.async_refresh()
+            # Scrittura ottimistica: sparisce subito solo l'occorrenza eliminata
+            self._apply_local_change(calendar_id, remove_keys=[event_key(current_event)])
+            
+            try:
+                await entity.async_delete_event(event_id, recurrence_id=current_event.get("recurrence_id"))
+            finally:
+                # Riscarica solo il calendario dell'evento: conferma o annulla l'eliminazione ottimistica
+                await self._async_refresh_after_write(calendar_id)
+            
+            # Gestione notifiche ora delegata al sensore BetterCalendarNotifications
             
             return True
             
@@ -744,64 +1472,38 @@ class BetterCalendarCoordinator(DataUpdateCoordinator):
 
 
     def merge_notifications_into_events(self, events_data: dict) -> dict:
-        """Fa il merge delle notifiche dal file separato negli eventi."""
+        """Fa il merge delle notifiche gestite dal sensore negli eventi."""
         try:
-            # Trova il file delle notifiche
-            component_dir = os.path.dirname(__file__)
-            notifications_file = os.path.join(component_dir, f"better_calendar_notifications_{self.entry_id}.json")
-            
-            if not os.path.exists(notifications_file):
+            notifications_sensor = self._get_notifications_sensor()
+            if notifications_sensor is None:
                 return events_data
             
-            # Carica le notifiche dal file separato
-            with open(notifications_file, 'r', encoding='utf-8') as f:
-                notifications_data = json.load(f)
-            
-            # Fa il merge delle notifiche negli eventi
+            # Fa il merge delle notifiche su copie degli eventi (gli originali sono i dati del coordinator)
             merged_events = events_data.copy()
+            merged_events["events"] = {}
             
-            for calendar_id, events in merged_events.get("events", {}).items():
-                for event in events:
-                    # Resetta le notifiche per l'evento
-                    event["notifications"] = []
+            for calendar_id, events in events_data.get("events", {}).items():
+                merged_events["events"][calendar_id] = []
+                for original_event in events:
+                    # Notifiche dell'evento (per uid o per titolo e inizio) dall'indice del sensore
+                    event = {**original_event, "notifications": []}
+                    merged_events["events"][calendar_id].append(event)
                     
-                    # Trova tutte le notifiche per questo evento
-                    for notif_id, notification in notifications_data.items():
-                        # Controlla se la notifica appartiene a questo evento
-                        if (notification.get('event_id') == event.get('uid') or
-                            (notification.get('event_summary') == event.get('summary') and
-                             self._event_start_matches(event.get('start', {}), notification.get('event_start')))):
-                            
-                            # Converti dal formato interno al formato del file events
-                            event_notification = {
-                                'id': notif_id,
-                                'type': notification.get('notification_type', 'push'),
-                                'offset_minutes': notification.get('offset_minutes', 15),
-                                'target_device': notification.get('target_device', 'auto'),
-                                'custom_message_push': notification.get('custom_message_push'),
-                                'custom_message_alexa': notification.get('custom_message_alexa'),
-                                'created_at': notification.get('created_at'),
-                                'enabled': notification.get('enabled', True)
-                            }
-                            
-                            event["notifications"].append(event_notification)
+                    for notif_id, notification in notifications_sensor.find_notifications_for_event(event):
+                        # Converti dal formato interno al formato del file events
+                        event["notifications"].append({
+                            'id': notif_id,
+                            'type': notification.get('notification_type', 'push'),
+                            'offset_minutes': notification.get('offset_minutes', 15),
+                            'target_device': notification.get('target_device', 'auto'),
+                            'custom_message_push': notification.get('custom_message_push'),
+                            'custom_message_alexa': notification.get('custom_message_alexa'),
+                            'created_at': notification.get('created_at'),
+                            'enabled': notification.get('enabled', True)
+                        })
             
             return merged_events
             
         except Exception as e:
             _LOGGER.error(f"❌ Errore merge notifiche: {e}")
             return events_data
-    
-    def _event_start_matches(self, event_start: dict, notification_start: str) -> bool:
-        """Verifica se la data di inizio dell'evento corrisponde a quella della notifica."""
-        if not event_start or not notification_start:
-            return False
-        
-        # Estrai la data dall'evento
-        event_start_str = ""
-        if "dateTime" in event_start:
-            event_start_str = event_start["dateTime"]
-        elif "date" in event_start:
-            event_start_str = event_start["date"]
-        
-        return event_start_str == notification_start or notification_start in event_start_str
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""Calcolo delle differenze tra due sincronizzazioni per Better Calendar."""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def event_key(event: Dict[str, Any]) -> str:
+    """Restituisce la chiave stabile di un evento.
+
+    Le occorrenze di un evento ricorrente condividono lo stesso uid, quindi la
+    chiave include anche recurrence_id (o l'inizio se non disponibile).
+    """
+    start = event.get("start", {})
+    if isinstance(start, dict):
+        start = start.get("dateTime") or start.get("date") or ""
+    return f"{event.get('uid', '')}|{event.get('recurrence_id') or start}"
+
+
+def event_fingerprint(event: Dict[str, Any]) -> str:
+    """Calcola l'impronta del contenuto di un evento (notifiche escluse)."""
+    content = {key: value for key, value in event.items() if key != "notifications"}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CalendarDelta:
+    """Differenze di un calendario rispetto alla sincronizzazione precedente."""
+
+    def __init__(self, calendar_id: str) -> None:
+        """Inizializza un delta vuoto."""
+        self.calendar_id = calendar_id
+        self.added: List[Dict[str, Any]] = []
+        self.changed: List[Dict[str, Any]] = []
+        self.removed: List[str] = []
+
+    @property
+    def has_changes(self) -> bool:
+        """Indica se il calendario è cambiato."""
+        return bool(self.added or self.changed or self.removed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Restituisce il delta in formato serializzabile."""
+        return {
+            "calendar_id": self.calendar_id,
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+        }
+
+
+def diff_calendar_events(
+    calendar_id: str,
+    previous: Optional[Dict[str, str]],
+    events: List[Dict[str, Any]],
+) -> Tuple[CalendarDelta, Dict[str, str]]:
+    """Confronta gli eventi scaricati con le impronte della sincronizzazione precedente.
+
+    Restituisce il delta e le nuove impronte (chiave evento -> impronta).
+    """
+    delta = CalendarDelta(calendar_id)
+    previous = previous or {}
+    fingerprints: Dict[str, str] = {}
+
+    for event in events:
+        key = event_key(event)
+        fingerprint = event_fingerprint(event)
+        fingerprints[key] = fingerprint
+
+        old_fingerprint = previous.get(key)
+        if old_fingerprint is None:
+            delta.added.append(event)
+        elif old_fingerprint != fingerprint:
+            delta.changed.append(event)
+
+    delta.removed = [key for key in previous if key not in fingerprints]
+    return delta, fingerprints
@@ -0,0 +1,183 @@
+"""Lettura in streaming dei file .ics per l'importazione in Better Calendar."""
+import itertools
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+
+_DURATION_RE = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+_ESCAPE_RE = re.compile(r"\\([\\;,nN])")
+
+Property = Tuple[str, Dict[str, str]]
+
+
+def iter_unfolded_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Riunisce le righe spezzate (RFC 5545: la continuazione inizia con spazio o tab)."""
+    current: Optional[str] = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _split_property(line: str) -> Optional[Tuple[str, Dict[str, str], str]]:
+    """Divide una riga in nome, parametri e valore (i due punti tra virgolette non contano)."""
+    in_quotes = False
+    for position, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            head, value = line[:position], line[position + 1:]
+            break
+    else:
+        return None
+
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw_param in raw_params:
+        key, _, param_value = raw_param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def iter_vevents(lines: Iterable[str]) -> Iterator[Dict[str, Property]]:
+    """Restituisce le proprietà di ogni VEVENT, uno alla volta.
+
+    Le proprietà dei componenti annidati (es. VALARM) vengono ignorate; per
+    le proprietà ripetute vale la prima.
+    """
+    stack: List[str] = []
+    properties: Dict[str, Property] = {}
+    for line in iter_unfolded_lines(lines):
+        parsed = _split_property(line)
+        if parsed is None:
+            continue
+        name, params, value = parsed
+
+        if name == "BEGIN":
+            stack.append(value.upper())
+            if value.upper() == "VEVENT":
+                properties = {}
+        elif name == "END":
+            component = stack.pop() if stack else None
+            if component == "VEVENT":
+                yield properties
+        elif stack and stack[-1] == "VEVENT":
+            properties.setdefault(name, (value, params))
+
+
+def _unescape(value: str) -> str:
+    """Toglie l'escape dai valori di testo."""
+    return _ESCAPE_RE.sub(lambda match: "\n" if match.group(1) in "nN" else match.group(1), value)
+
+
+def _parse_date_value(prop: Property) -> Optional[Any]:
+    """Converte DTSTART/DTEND in date (tutto il giorno) o datetime con fuso orario."""
+    value, params = prop
+    value = value.strip()
+    try:
+        if params.get("VALUE") == "DATE" or len(value) == 8:
+            return datetime.strptime(value[:8], "%Y%m%d").date()
+        if value.endswith("Z"):
+            return datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=dt_util.UTC)
+        parsed = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None
+
+    # TZID sconosciuti (es. nomi Windows) e orari "floating" valgono come ora locale
+    time_zone = dt_util.get_time_zone(params["TZID"]) if "TZID" in params else None
+    if time_zone is not None:
+        return parsed.replace(tzinfo=time_zone)
+    return dt_util.as_local(parsed)
+
+
+def _parse_duration(value: str) -> Optional[timedelta]:
+    """Converte una DURATION (es. PT1H30M) in timedelta."""
+    match = _DURATION_RE.match(value.strip())
+    if match is None:
+        return None
+    parts = {key: int(part) for key, part in match.groupdict().items() if key != "sign" and part}
+    duration = timedelta(**parts)
+    return -duration if match.group("sign") == "-" else duration
+
+
+def vevent_to_event(properties: Dict[str, Property]) -> Optional[Dict[str, Any]]:
+    """Converte le proprietà di un VEVENT nei dati usati da create_events.
+
+    Le eccezioni di una serie (RECURRENCE-ID) vengono saltate (None): l'evento
+    principale porta già la regola di ripetizione. Solleva ValueError per gli
+    eventi che il calendario rifiuterebbe (senza titolo, inizio o durata).
+    """
+    if "RECURRENCE-ID" in properties:
+        return None
+    if "DTSTART" not in properties:
+        raise ValueError("DTSTART mancante")
+    start = _parse_date_value(properties["DTSTART"])
+    if start is None:
+        raise ValueError(f"DTSTART non valido: {properties['DTSTART'][0]}")
+    summary = _unescape(properties.get("SUMMARY", ("", {}))[0]).strip()
+    if not summary:
+        raise ValueError("SUMMARY mancante")
+
+    end = _parse_date_value(properties["DTEND"]) if "DTEND" in properties else None
+    if end is None and "DURATION" in properties:
+        duration = _parse_duration(properties["DURATION"][0])
+        if duration is not None:
+            end = start + duration
+    if end is None:
+        # Senza fine (RFC 5545): un giorno per gli eventi tutto il giorno, durata nulla per gli altri
+        end = start + timedelta(days=1) if not isinstance(start, datetime) else start
+
+    all_day = not isinstance(start, datetime)
+    if all_day and isinstance(end, datetime):
+        end = end.date()
+    elif not all_day and not isinstance(end, datetime):
+        end = dt_util.start_of_local_day(end)
+    if end <= start:
+        # Durata nulla o negativa: il calendario non la accetta
+        raise ValueError("evento senza durata")
+
+    event = {
+        "summary": summary,
+        "description": _unescape(properties.get("DESCRIPTION", ("", {}))[0]),
+        "start_datetime": start,
+        "end_datetime": end,
+        "all_day": all_day,
+    }
+    for key, name in (("location", "LOCATION"), ("uid", "UID"), ("rrule", "RRULE")):
+        if name in properties:
+            event[key] = _unescape(properties[name][0]) if key == "location" else properties[name][0].strip()
+    return event
+
+
+def iter_ics_events(path: str) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Legge un file .ics evento per evento, senza caricarlo tutto in memoria.
+
+    Restituisce (evento, None) o, per gli eventi non importabili, (None, motivo).
+    Da consumare nell'executor: legge dal disco.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as ics_file:
+        for properties in iter_vevents(ics_file):
+            try:
+                event = vevent_to_event(properties)
+            except ValueError as err:
+                uid = properties.get("UID", ("", {}))[0].strip()
+                yield None, f"{uid or '(senza uid)'}: {err}"
+                continue
+            if event is not None:
+                yield event, None
+
+
+def next_batch(events: Iterator[Any], size: int) -> List[Any]:
+    """Prende il prossimo blocco di eventi dal generatore (nell'executor)."""
+    return list(itertools.islice(events, size))
@@ -0,0 +1,101 @@
+"""Indice a intervalli sugli eventi di Better Calendar."""
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+from .models import EventRecord
+
+
+class EventIndex:
+    """Albero di intervalli statico costruito sui record ordinati per inizio.
+
+    L'albero è implicito: ogni sottointervallo [lo, hi) dell'array ordinato ha
+    come radice l'elemento centrale, che memorizza la fine massima del proprio
+    sottoalbero. Le query di sovrapposizione scartano interi sottoalberi e
+    costano O(log n + k).
+    """
+
+    def __init__(self, records: Iterable[EventRecord]) -> None:
+        """Costruisce l'indice (una volta per sincronizzazione)."""
+        self.records: List[EventRecord] = sorted(records, key=lambda record: record.start_ts)
+        self._starts = [record.start_ts for record in self.records]
+        self._ends = [max(record.end_ts, record.start_ts) for record in self.records]
+        self._max_end = [0.0] * len(self.records)
+        if self.records:
+            self._build(0, len(self.records))
+
+    def __len__(self) -> int:
+        """Numero di eventi indicizzati."""
+        return len(self.records)
+
+    def _build(self, lo: int, hi: int) -> float:
+        """Calcola la fine massima di ogni sottoalbero."""
+        mid = (lo + hi) // 2
+        max_end = self._ends[mid]
+        if lo < mid:
+            max_end = max(max_end, self._build(lo, mid))
+        if mid + 1 < hi:
+            max_end = max(max_end, self._build(mid + 1, hi))
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start_ts: float, end_ts: float) -> List[EventRecord]:
+        """Restituisce gli eventi che toccano l'intervallo [start_ts, end_ts), ordinati per inizio.
+
+        Gli eventi di durata nulla sono inclusi se iniziano dentro l'intervallo.
+        """
+        starts = self._starts
+        ends = self._ends
+        max_end = self._max_end
+        matches: List[int] = []
+        stack = [(0, len(starts))]
+
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            # Nessun evento del sottoalbero arriva all'inizio dell'intervallo
+            if max_end[mid] < start_ts:
+                continue
+            stack.append((lo, mid))
+            # A destra gli inizi sono tutti successivi: si scende solo se mid è prima della fine
+            if starts[mid] < end_ts:
+                if ends[mid] > start_ts or starts[mid] >= start_ts:
+                    matches.append(mid)
+                stack.append((mid + 1, hi))
+
+        matches.sort()
+        return [self.records[position] for position in matches]
+
+
+class EventSnapshot:
+    """Vista immutabile degli eventi pubblicata dal coordinator dopo ogni sincronizzazione.
+
+    Le query leggono un solo riferimento allo snapshot, quindi vedono sempre
+    indice e giorni della stessa sincronizzazione.
+    """
+
+    __slots__ = ("generation", "index", "day_buckets", "last_updated")
+
+    def __init__(
+        self,
+        generation: int,
+        index: EventIndex,
+        day_buckets: Mapping[date, Tuple[EventRecord, ...]],
+        last_updated: Optional[datetime] = None,
+    ) -> None:
+        """Inizializza lo snapshot."""
+        self.generation = generation
+        self.index = index
+        self.day_buckets = MappingProxyType(dict(day_buckets))
+        self.last_updated = last_updated
+
+    @property
+    def records(self) -> List[EventRecord]:
+        """Tutti i record ordinati per inizio."""
+        return self.index.records
+
+    def events_on_day(self, day: date) -> Tuple[EventRecord, ...]:
+        """Record degli eventi che toccano un giorno locale."""
+        return self.day_buckets.get(day, ())
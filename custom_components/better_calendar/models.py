@@ -0,0 +1,111 @@
+"""Modelli dati per Better Calendar."""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+
+
+class EventRecord:
+    """Evento normalizzato con orari già convertiti.
+
+    Viene creato una sola volta per sincronizzazione così i sensori non devono
+    rileggere le stringhe ISO dell'evento a ogni lettura delle proprietà.
+    """
+
+    __slots__ = ("uid", "calendar_id", "start_ts", "end_ts", "all_day", "local_date", "event")
+
+    def __init__(
+        self,
+        uid: str,
+        calendar_id: str,
+        start_ts: float,
+        end_ts: float,
+        all_day: bool,
+        local_date: date,
+        event: Dict[str, Any],
+    ) -> None:
+        """Inizializza il record."""
+        self.uid = uid
+        self.calendar_id = calendar_id
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.all_day = all_day
+        self.local_date = local_date
+        self.event = event
+
+    @classmethod
+    def from_event(cls, calendar_id: str, event: Dict[str, Any]) -> Optional["EventRecord"]:
+        """Crea il record da un evento normalizzato dal coordinator."""
+        start_info = event.get("start") or {}
+        end_info = event.get("end") or {}
+        if not isinstance(start_info, dict) or not isinstance(end_info, dict):
+            return None
+
+        if "date" in start_info:
+            start_date = dt_util.parse_date(start_info["date"])
+            if start_date is None:
+                return None
+            end_date = dt_util.parse_date(end_info.get("date", "")) if "date" in end_info else None
+            # La data di fine degli eventi tutto il giorno è esclusiva
+            if end_date is None or end_date <= start_date:
+                end_date = start_date + timedelta(days=1)
+            return cls(
+                event.get("uid", ""),
+                calendar_id,
+                dt_util.start_of_local_day(start_date).timestamp(),
+                dt_util.start_of_local_day(end_date).timestamp(),
+                True,
+                start_date,
+                event,
+            )
+
+        start_dt = _parse_local_datetime(start_info.get("dateTime"))
+        if start_dt is None:
+            return None
+        end_dt = _parse_local_datetime(end_info.get("dateTime")) or start_dt
+        if end_dt < start_dt:
+            end_dt = start_dt
+        return cls(
+            event.get("uid", ""),
+            calendar_id,
+            start_dt.timestamp(),
+            end_dt.timestamp(),
+            False,
+            start_dt.date(),
+            event,
+        )
+
+    @property
+    def local_start(self) -> datetime:
+        """Inizio dell'evento nel fuso orario di Home Assistant."""
+        return dt_util.as_local(dt_util.utc_from_timestamp(self.start_ts))
+
+
+def _parse_local_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Converte una stringa ISO in datetime locale (le date senza fuso sono locali)."""
+    if not value:
+        return None
+    parsed = dt_util.parse_datetime(value)
+    if parsed is None:
+        return None
+    return dt_util.as_local(parsed)
+
+
+def notification_timestamps(
+    event_start: Optional[str], offset_minutes: Any
+) -> Tuple[Optional[float], Optional[float]]:
+    """Calcola (inizio evento, orario di invio) di una notifica come epoch UTC al minuto.
+
+    Le date senza fuso sono considerate UTC, come nel resto del sistema notifiche.
+    """
+    if not event_start:
+        return None, None
+    try:
+        start_dt = datetime.fromisoformat(event_start.replace("Z", "+00:00"))
+        offset = timedelta(minutes=int(offset_minutes or 0))
+    except (TypeError, ValueError):
+        return None, None
+    if start_dt.tzinfo is None:
+        start_dt = dt_util.as_utc(start_dt)
+    start_dt = start_dt.replace(second=0, microsecond=0)
+    return start_dt.timestamp(), (start_dt - offset).timestamp()
@@ -0,0 +1,116 @@
+"""Indice delle notifiche per l'associazione con gli eventi di Better Calendar."""
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, Union
+
+from homeassistant.util import dt as dt_util
+
+StartKey = Union[int, str]
+
+
+def _normalize_start(value: Optional[str]) -> List[StartKey]:
+    """Chiavi normalizzate di un orario di inizio.
+
+    Un orario completo diventa il minuto UTC (epoch/60) più la data scritta
+    nella stringa; una data sola resta la data ISO. Così una notifica su un
+    giorno intero trova anche gli eventi con orario di quel giorno.
+    """
+    if not value:
+        return []
+    if "T" not in value:
+        return [value[:10]]
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return [value[:10]]
+    if parsed.tzinfo is None:
+        # Stessa convenzione di Home Assistant: senza fuso è ora locale
+        parsed = dt_util.as_local(parsed)
+    return [int(parsed.timestamp()) // 60, value[:10]]
+
+
+def _notification_start_key(value: Optional[str]) -> Optional[StartKey]:
+    """Chiave con cui una notifica viene indicizzata (la più precisa disponibile)."""
+    keys = _normalize_start(value)
+    return keys[0] if keys else None
+
+
+def _event_start_value(start: Any) -> Optional[str]:
+    """Estrae la stringa di inizio da un evento normalizzato."""
+    if isinstance(start, dict):
+        return start.get("dateTime") or start.get("date")
+    return start
+
+
+class NotificationIndex:
+    """Mappe uid evento -> notifiche e (titolo, inizio) -> notifiche.
+
+    Viene aggiornato a ogni modifica, così l'associazione con gli eventi è
+    lineare nel numero di eventi invece di eventi × notifiche.
+    """
+
+    def __init__(self) -> None:
+        """Inizializza un indice vuoto."""
+        self._by_event_id: Dict[str, Set[str]] = {}
+        self._by_summary_start: Dict[Tuple[str, StartKey], Set[str]] = {}
+        self._keys: Dict[str, Tuple[Optional[str], Optional[Tuple[str, StartKey]]]] = {}
+
+    def __len__(self) -> int:
+        """Numero di notifiche indicizzate."""
+        return len(self._keys)
+
+    def rebuild(self, notifications: Dict[str, Dict[str, Any]]) -> None:
+        """Ricostruisce l'indice da tutte le notifiche (al caricamento)."""
+        self._by_event_id.clear()
+        self._by_summary_start.clear()
+        self._keys.clear()
+        for notif_id, notification in notifications.items():
+            self.update(notif_id, notification)
+
+    def update(self, notif_id: str, notification: Dict[str, Any]) -> None:
+        """Indicizza una notifica aggiunta o modificata."""
+        self.remove(notif_id)
+
+        event_id = notification.get("event_id") or None
+        start_key = _notification_start_key(notification.get("event_start"))
+        summary = notification.get("event_summary")
+        summary_key = (summary, start_key) if summary and start_key is not None else None
+
+        if event_id:
+            self._by_event_id.setdefault(event_id, set()).add(notif_id)
+        if summary_key:
+            self._by_summary_start.setdefault(summary_key, set()).add(notif_id)
+        self._keys[notif_id] = (event_id, summary_key)
+
+    def remove(self, notif_id: str) -> None:
+        """Toglie una notifica dall'indice."""
+        keys = self._keys.pop(notif_id, None)
+        if keys is None:
+            return
+        event_id, summary_key = keys
+        self._discard(self._by_event_id, event_id, notif_id)
+        self._discard(self._by_summary_start, summary_key, notif_id)
+
+    @staticmethod
+    def _discard(mapping: Dict[Any, Set[str]], key: Optional[Hashable], notif_id: str) -> None:
+        """Rimuove un id da un gruppo, eliminando i gruppi vuoti."""
+        if key is None:
+            return
+        ids = mapping.get(key)
+        if ids is None:
+            return
+        ids.discard(notif_id)
+        if not ids:
+            del mapping[key]
+
+    def ids_for_event_id(self, event_id: str) -> Set[str]:
+        """Id delle notifiche collegate a un uid evento."""
+        return set(self._by_event_id.get(event_id, ()))
+
+    def ids_for_event(self, event: Dict[str, Any]) -> Set[str]:
+        """Id delle notifiche di un evento: per uid o per titolo e inizio."""
+        ids = set(self._by_event_id.get(event.get("uid"), ()))
+        summary = event.get("summary")
+        if summary:
+            for start_key in _normalize_start(_event_start_value(event.get("start"))):
+                ids.update(self._by_summary_start.get((summary, start_key), ()))
+        return ids
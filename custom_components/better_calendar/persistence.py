@@ -0,0 +1,184 @@
+"""Salvataggio su disco (in .storage) degli eventi e delle notifiche di Better Calendar."""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import notification_timestamps
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENTS_STORAGE_VERSION = 1
+NOTIFICATIONS_STORAGE_VERSION = 3
+
+# Ritardo dei salvataggi delle notifiche: più modifiche ravvicinate diventano una sola scrittura
+NOTIFICATIONS_SAVE_DELAY = 10  # secondi
+
+
+def snapshot_hash(fingerprints: Dict[str, Dict[str, str]]) -> str:
+    """Calcola l'impronta dell'intero snapshot dalle impronte dei singoli eventi.
+
+    Non serve serializzare gli eventi: le impronte sono già calcolate dal
+    confronto delle sincronizzazioni (e non includono le notifiche).
+    """
+    digest = hashlib.sha1()
+    for calendar_id in sorted(fingerprints):
+        digest.update(calendar_id.encode("utf-8"))
+        for key, fingerprint in sorted(fingerprints[calendar_id].items()):
+            digest.update(key.encode("utf-8"))
+            digest.update(fingerprint.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _migrate_events(old_version: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Porta i dati degli eventi allo schema corrente.
+
+    La versione 0 è il vecchio file JSON nella cartella del componente.
+    """
+    if old_version < 1:
+        data = {
+            "last_updated": data.get("last_updated") or data.get("last_update"),
+            "content_hash": data.get("content_hash"),
+            "events": data.get("events", {}),
+        }
+    return data
+
+
+def _migrate_notifications(old_version: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Porta i dati delle notifiche allo schema corrente.
+
+    La versione 0 è il vecchio file JSON (dizionario id -> notifica).
+    """
+    if old_version < 1:
+        data = {"notifications": data}
+    if old_version < 2:
+        # Protezione dai doppi invii: id inviati (-> orario di invio) e ultimo controllo riuscito
+        data = {**data, "sent": {}, "last_tick": None}
+    if old_version < 3:
+        # Inizio evento e orario di invio precalcolati: niente parsing a ogni controllo
+        for notification in data["notifications"].values():
+            notification["event_start_ts"], notification["due_ts"] = notification_timestamps(
+                notification.get("event_start"), notification.get("offset_minutes")
+            )
+    return data
+
+
+class BetterCalendarStore(Store):
+    """Store versionato con migrazione dello schema."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        version: int,
+        key: str,
+        migrate: Callable[[int, Dict[str, Any]], Dict[str, Any]],
+        serialize_in_event_loop: bool = True,
+    ) -> None:
+        """Inizializza lo store.
+
+        Le scritture sono atomiche (file temporaneo e rinomina): un riavvio a
+        metà salvataggio non lascia un file troncato.
+        """
+        try:
+            super().__init__(
+                hass,
+                version,
+                key,
+                atomic_writes=True,
+                serialize_in_event_loop=serialize_in_event_loop,
+            )
+        except TypeError:
+            # Home Assistant senza serialize_in_event_loop: si serializza sempre nel loop
+            super().__init__(hass, version, key, atomic_writes=True)
+        self._migrate = migrate
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Migra i dati salvati con una versione precedente."""
+        return self._migrate(old_major_version, old_data)
+
+    async def async_load_or_import(self, legacy_path: str) -> Optional[Dict[str, Any]]:
+        """Carica i dati, importando (una sola volta) il vecchio file JSON se presente."""
+        data = await self.async_load()
+        if data is not None:
+            return data
+
+        def _read_legacy() -> Optional[Dict[str, Any]]:
+            if not os.path.exists(legacy_path):
+                return None
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        try:
+            legacy_data = await self.hass.async_add_executor_job(_read_legacy)
+        except (OSError, ValueError) as err:
+            _LOGGER.warning(f"⚠️ File {legacy_path} illeggibile, non importato: {err}")
+            return None
+
+        if legacy_data is None:
+            return None
+
+        data = self._migrate(0, legacy_data)
+        await self.async_save(data)
+        await self.hass.async_add_executor_job(os.remove, legacy_path)
+        _LOGGER.info(f"✅ Migrato {legacy_path} in .storage/{self.key}")
+        return data
+
+
+def events_store(hass: HomeAssistant, entry_id: str) -> BetterCalendarStore:
+    """Store dello snapshot eventi di una entry.
+
+    Lo snapshot può essere grande: la serializzazione JSON avviene nell'executor.
+    """
+    return BetterCalendarStore(
+        hass,
+        EVENTS_STORAGE_VERSION,
+        f"{DOMAIN}.{entry_id}.events",
+        _migrate_events,
+        serialize_in_event_loop=False,
+    )
+
+
+def notifications_store(hass: HomeAssistant, entry_id: str) -> BetterCalendarStore:
+    """Store delle notifiche di una entry."""
+    return BetterCalendarStore(
+        hass, NOTIFICATIONS_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.notifications", _migrate_notifications
+    )
+
+
+class EventsSnapshotWriter:
+    """Salva lo snapshot degli eventi solo quando il contenuto è cambiato."""
+
+    def __init__(self, store: BetterCalendarStore) -> None:
+        """Inizializza il writer per lo store indicato."""
+        self.store = store
+        self._last_hash: Optional[str] = None
+
+    def set_persisted(self, data: Optional[Dict[str, Any]]) -> None:
+        """Registra l'impronta dello snapshot già salvato (letto all'avvio)."""
+        self._last_hash = data.get("content_hash") if data else None
+
+    async def async_write(self, events: Dict[str, Any], content_hash: str, last_updated: str) -> bool:
+        """Salva gli eventi se l'impronta è diversa dall'ultima salvata.
+
+        Restituisce True se lo snapshot è stato scritto.
+        """
+        if content_hash == self._last_hash:
+            return False
+
+        # Le notifiche sono gestite separatamente: negli eventi normalizzati sono sempre vuote
+        await self.store.async_save(
+            {
+                "last_updated": last_updated,
+                "content_hash": content_hash,
+                "events": events,
+            }
+        )
+        self._last_hash = content_hash
+        return True
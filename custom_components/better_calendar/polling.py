@@ -0,0 +1,99 @@
+"""Frequenza di aggiornamento adattiva per i singoli calendari di Better Calendar."""
+from typing import Dict, Iterable, List, Optional
+
+
+class CalendarPollState:
+    """Stato di polling di un calendario."""
+
+    __slots__ = ("interval", "next_due_ts", "polls", "changes", "last_change_ts")
+
+    def __init__(self, interval: float) -> None:
+        """Inizializza lo stato (subito da scaricare)."""
+        self.interval = interval
+        self.next_due_ts = 0.0
+        self.polls = 0
+        self.changes = 0
+        self.last_change_ts: Optional[float] = None
+
+    @property
+    def change_rate(self) -> float:
+        """Frazione delle sincronizzazioni che hanno trovato modifiche."""
+        return self.changes / self.polls if self.polls else 0.0
+
+
+class AdaptivePollPlanner:
+    """Decide quali calendari scaricare a ogni ciclo del coordinator.
+
+    Un calendario senza modifiche raddoppia il proprio intervallo fino al
+    massimo; appena cambia torna all'intervallo minimo. Il ciclo del
+    coordinator resta l'intervallo minimo.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float) -> None:
+        """Inizializza il planner con i limiti in secondi."""
+        self._states: Dict[str, CalendarPollState] = {}
+        self.set_bounds(min_interval, max_interval)
+
+    def set_bounds(self, min_interval: float, max_interval: float) -> None:
+        """Aggiorna i limiti (es. dopo una modifica delle opzioni)."""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        for state in self._states.values():
+            state.interval = min(max(state.interval, self.min_interval), self.max_interval)
+
+    def due_calendars(self, calendar_ids: Iterable[str], now_ts: float) -> List[str]:
+        """Calendari da scaricare ora.
+
+        Mezzo ciclo di tolleranza: un calendario all'intervallo minimo non
+        salta un giro per il ritardo con cui parte il ciclo.
+        """
+        threshold = now_ts + self.min_interval / 2
+        due = []
+        for calendar_id in calendar_ids:
+            state = self._states.get(calendar_id)
+            if state is None or state.next_due_ts <= threshold:
+                due.append(calendar_id)
+        return due
+
+    def record_poll(self, calendar_id: str, changed: bool, now_ts: float) -> None:
+        """Registra l'esito di un download riuscito e ricalcola l'intervallo."""
+        state = self._states.get(calendar_id)
+        if state is None:
+            state = self._states[calendar_id] = CalendarPollState(self.min_interval)
+        elif changed:
+            state.interval = self.min_interval
+        else:
+            state.interval = min(state.interval * 2, self.max_interval)
+
+        state.polls += 1
+        if changed:
+            state.changes += 1
+            state.last_change_ts = now_ts
+        state.next_due_ts = now_ts + state.interval
+
+    def record_failure(self, calendar_id: str, now_ts: float) -> None:
+        """Download fallito: si riprova al prossimo ciclo senza toccare l'intervallo."""
+        state = self._states.get(calendar_id)
+        if state is not None:
+            state.next_due_ts = now_ts + self.min_interval
+
+    def mark_due(self, calendar_ids: Optional[Iterable[str]] = None) -> None:
+        """Forza il download al prossimo ciclo (di tutti i calendari se non indicati)."""
+        states = (
+            self._states.values()
+            if calendar_ids is None
+            else [self._states[calendar_id] for calendar_id in calendar_ids if calendar_id in self._states]
+        )
+        for state in states:
+            state.next_due_ts = 0.0
+
+    def forget_missing(self, calendar_ids: Iterable[str]) -> None:
+        """Dimentica i calendari non più selezionati."""
+        keep = set(calendar_ids)
+        for calendar_id in list(self._states):
+            if calendar_id not in keep:
+                del self._states[calendar_id]
+
+    def intervals(self) -> Dict[str, float]:
+        """Intervallo corrente (secondi) di ogni calendario."""
+        return {calendar_id: state.interval for calendar_id, state in self._states.items()}
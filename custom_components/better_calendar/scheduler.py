@@ -0,0 +1,70 @@
+"""Coda delle notifiche di Better Calendar ordinata per orario di invio."""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+
+class NotificationScheduler:
+    """Min-heap di (orario di invio, id notifica).
+
+    Rimozioni e riprogrammazioni non toccano l'heap: le voci superate restano
+    finché non arrivano in cima e vengono scartate (cancellazione pigra).
+    """
+
+    def __init__(self) -> None:
+        """Inizializza una coda vuota."""
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        """Numero di notifiche programmate."""
+        return len(self._due)
+
+    def __contains__(self, notif_id: str) -> bool:
+        """Indica se la notifica è programmata."""
+        return notif_id in self._due
+
+    def schedule(self, notif_id: str, due_ts: float) -> None:
+        """Programma (o riprogramma) una notifica."""
+        if self._due.get(notif_id) == due_ts:
+            return
+        self._due[notif_id] = due_ts
+        heapq.heappush(self._heap, (due_ts, notif_id))
+        self._compact()
+
+    def unschedule(self, notif_id: str) -> None:
+        """Toglie una notifica dalla coda."""
+        if self._due.pop(notif_id, None) is not None:
+            self._compact()
+
+    def clear(self) -> None:
+        """Svuota la coda."""
+        self._heap.clear()
+        self._due.clear()
+
+    def next_due(self) -> Optional[float]:
+        """Orario della prossima notifica da inviare."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now_ts: float) -> List[Tuple[float, str]]:
+        """Estrae, in ordine, le notifiche con orario di invio <= now_ts."""
+        due: List[Tuple[float, str]] = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now_ts:
+            due_ts, notif_id = heapq.heappop(self._heap)
+            del self._due[notif_id]
+            due.append((due_ts, notif_id))
+            self._drop_stale()
+        return due
+
+    def _drop_stale(self) -> None:
+        """Scarta dalla cima le voci rimosse o riprogrammate."""
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        """Ricostruisce l'heap quando le voci superate sono la maggioranza."""
+        if len(self._heap) > 2 * len(self._due) + 32:
+            self._heap = [(due_ts, notif_id) for notif_id, due_ts in self._due.items()]
+            heapq.heapify(self._heap)
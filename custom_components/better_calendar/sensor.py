@@ -1,10 +1,11 @@
 """Sensori per Better Calendar."""
 import asyncio
-import json
 import logging
 import os
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
@@ -12,11 +13,19 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_time_change,
+    async_track_time_interval,
+)
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, ATTR_START_TIME, ATTR_END_TIME, ATTR_SUMMARY, ATTR_DESCRIPTION, ATTR_LOCATION, ATTR_CALENDAR_NAME
+from .const import DOMAIN, DEFAULT_NOTIFICATION_GRACE, MAX_CONCURRENT_NOTIFICATION_SENDS, NOTIFICATION_RETRY_SECONDS, NOTIFICATION_EXPIRY_HOURS, ATTR_START_TIME, ATTR_END_TIME, ATTR_SUMMARY, ATTR_DESCRIPTION, ATTR_LOCATION, ATTR_CALENDAR_NAME
 from .coordinator import BetterCalendarCoordinator
+from .models import EventRecord, notification_timestamps
+from .persistence import NOTIFICATIONS_SAVE_DELAY, notifications_store
+from .notification_index import NotificationIndex
+from .scheduler import NotificationScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,6 +60,10 @@ async def async_setup_entry(
 class BetterCalendarSensorBase(CoordinatorEntity, SensorEntity):
     """Classe base per i sensori Better Calendar."""
 
+    # Lo stato dipende anche dall'ora: il coordinator notifica solo i dati cambiati,
+    # quindi lo stato viene riscritto a questo orario locale (None: mai)
+    _time_trigger: Optional[Dict[str, int]] = {"hour": 0, "minute": 0, "second": 0}
+
     def __init__(self, coordinator: BetterCalendarCoordinator, sensor_type: str) -> None:
         super().__init__(coordinator)
         self._coordinator = coordinator
@@ -86,6 +99,10 @@ class BetterCalendarSensorBase(CoordinatorEntity, SensorEntity):
                 "sw_version": "1.0",
             }
         
+        # Cache dei valori calcolati, valida per generazione dei dati e giorno locale
+        self._cache: Dict[str, Any] = {}
+        self._cache_key_value: Optional[Tuple[Any, ...]] = None
+        
         self._attr_unique_id = f"{DOMAIN}_{coordinator.entry_id}_{sensor_type}"
         self._attr_should_poll = False
         self._attr_name = self._name
@@ -114,8 +131,39 @@ class BetterCalendarSensorBase(CoordinatorEntity, SensorEntity):
         """Aggiorna il sensore."""
         # Il sensore si aggiorna automaticamente quando viene chiamato native_value
 
+    async def async_added_to_hass(self) -> None:
+        """Registra la riscrittura periodica dello stato."""
+        await super().async_added_to_hass()
+        if self._time_trigger is not None:
+            self.async_on_remove(
+                async_track_time_change(self.hass, self._async_time_changed, **self._time_trigger)
+            )
+
+    @callback
+    def _async_time_changed(self, now: datetime) -> None:
+        """Riscrive lo stato: la chiave della cache (giorno/minuto) è cambiata da sola."""
+        self.async_write_ha_state()
+
+    def _cache_key(self) -> Tuple[Any, ...]:
+        """Chiave di validità della cache: generazione dei dati e giorno locale."""
+        return (getattr(self.coordinator, "generation", None), dt_util.now().date())
+
+    def _memoize(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Calcola un valore al massimo una volta per aggiornamento o cambio di giorno."""
+        key = self._cache_key()
+        if key != self._cache_key_value:
+            self._cache = {}
+            self._cache_key_value = key
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
     def _load_events_from_file(self) -> Dict[str, Any]:
         """Carica gli eventi dal coordinator."""
+        return self._memoize("events_data", self._read_coordinator_events)
+
+    def _read_coordinator_events(self) -> Dict[str, Any]:
+        """Legge gli eventi dal coordinator."""
         try:
             # Prima opzione: usa i dati del coordinator se disponibili
             if hasattr(self.coordinator, 'data') and self.coordinator.data:
@@ -157,6 +205,10 @@ class BetterCalendarSensorBase(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Restituisce gli attributi aggiuntivi del sensore."""
+        return self._memoize("attributes", self._build_attributes)
+
+    def _build_attributes(self) -> Dict[str, Any]:
+        """Calcola gli attributi aggiuntivi del sensore."""
         data = self._load_events_from_file()
         return {
             "last_update": data.get("last_update"),
@@ -167,6 +219,9 @@ class BetterCalendarSensorBase(CoordinatorEntity, SensorEntity):
 class BetterCalendarSummary(BetterCalendarSensorBase):
     """Sensore che mostra un riassunto generale."""
 
+    # Conta tutti gli eventi: non dipende dal giorno
+    _time_trigger = None
+
     def __init__(self, coordinator: BetterCalendarCoordinator) -> None:
         """Inizializza il sensore summary."""
         super().__init__(coordinator, "summary")
@@ -175,24 +230,30 @@ class BetterCalendarSummary(BetterCalendarSensorBase):
     @property
     def native_value(self) -> int:
         """Restituisce il numero totale di eventi."""
+        return self._memoize("total_events", self._count_events)
+
+    def _count_events(self) -> int:
+        """Conta tutti gli eventi."""
         data = self._load_events_from_file()
         events_data = data.get("events", {})
         
-        # Conta tutti gli eventi
-        total_events = sum(len(events) for events in events_data.values())
-        
-        return total_events
+        return sum(len(events) for events in events_data.values())
 
-    @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def _cache_key(self) -> Tuple[Any, ...]:
+        """Le metriche di avvio arrivano anche senza una nuova generazione dei dati."""
+        return (*super()._cache_key(), getattr(self.coordinator, "startup_refresh_seconds", None))
+
+    def _build_attributes(self) -> Dict[str, Any]:
         """Attributi aggiuntivi del sensore summary."""
-        attrs = super().extra_state_attributes
+        attrs = super()._build_attributes()
         data = self._load_events_from_file()
         
         calendars = data.get("calendars", {})
         attrs.update({
             "calendars": list(calendars.keys()),
             "calendar_names": [cal.get("name", cal_id) for cal_id, cal in calendars.items()],
+            "warm_start_ms": getattr(self.coordinator, "warm_start_ms", None),
+            "startup_refresh_seconds": getattr(self.coordinator, "startup_refresh_seconds", None),
         })
         
         return attrs
@@ -201,6 +262,9 @@ class BetterCalendarSummary(BetterCalendarSensorBase):
 class BetterCalendarUpcoming(BetterCalendarSensorBase):
     """Sensore per gli eventi prossimi (prossimi 7 giorni)."""
 
+    # La finestra parte da adesso: ricalcolata a ogni minuto
+    _time_trigger = {"second": 0}
+
     def __init__(self, coordinator: BetterCalendarCoordinator) -> None:
         """Inizializza il sensore upcoming."""
         super().__init__(coordinator, "upcoming")
@@ -212,84 +276,31 @@ class BetterCalendarUpcoming(BetterCalendarSensorBase):
         upcoming_events = self._get_upcoming_events()
         return len(upcoming_events)
 
-    def _get_upcoming_events(self) -> List[Dict[str, Any]]:
-        """Ottieni eventi nei prossimi 7 giorni dal file JSON."""
-        data = self._load_events_from_file()
-        events_data = data.get("events", {})
-        
-        now = dt_util.utcnow()
-        end_date = now + timedelta(days=7)
-        upcoming_events = []
-        
-        for calendar_id, events in events_data.items():
-            for event in events:
-                event_start = self._get_event_start_datetime(event)
-                if event_start and now <= event_start <= end_date:
-                    # Aggiungi info calendario
-                    event_copy = event.copy()
-                    calendar_info = data.get("calendars", {}).get(calendar_id, {})
-                    event_copy["calendar_name"] = calendar_info.get("name", calendar_id)
-                    upcoming_events.append(event_copy)
-        
-        # Ordina per data di inizio
-        upcoming_events.sort(key=lambda x: self._get_event_start_datetime(x))
-        return upcoming_events
+    def _cache_key(self) -> Tuple[Any, ...]:
+        """La finestra parte da adesso: la cache vale al massimo un minuto."""
+        return (*super()._cache_key(), int(dt_util.utcnow().timestamp() // 60))
 
-    def _get_event_start_datetime(self, event: Dict[str, Any]) -> Optional[datetime]:
-        """Ottieni la data/ora di inizio dell'evento."""
-        start_info = event.get("start", {})
-        
-        # Se start_info è una stringa, gestiscila direttamente
-        if isinstance(start_info, str):
-            try:
-                if "T" in start_info:
-                    # Formato datetime: 2025-08-17T16:00:00+02:00
-                    dt = datetime.fromisoformat(start_info.replace("Z", "+00:00"))
-                    # Assicurati che abbia timezone
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=dt_util.UTC)
-                    return dt
-                else:
-                    # Formato solo data: 2025-06-27 - aggiungi timezone UTC
-                    dt = datetime.fromisoformat(start_info + "T00:00:00")
-                    return dt.replace(tzinfo=dt_util.UTC)
-            except Exception as e:
-                return None
-        
-        # Caso normale: start_info è un dizionario
-        elif isinstance(start_info, dict):
-            if "dateTime" in start_info:
-                try:
-                    dt = datetime.fromisoformat(start_info["dateTime"].replace("Z", "+00:00"))
-                    # Assicurati che abbia timezone
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=dt_util.UTC)
-                    return dt
-                except:
-                    parsed_dt = dt_util.parse_datetime(start_info["dateTime"])
-                    return parsed_dt if parsed_dt else None
-            elif "date" in start_info:
-                try:
-                    dt = datetime.fromisoformat(start_info["date"] + "T00:00:00")
-                    return dt.replace(tzinfo=dt_util.UTC)
-                except:
-                    date_obj = dt_util.parse_date(start_info["date"])
-                    return dt_util.start_of_local_day(date_obj) if date_obj else None
-        
-        return None
+    def _get_upcoming_events(self) -> List[EventRecord]:
+        """Ottieni eventi in corso o nei prossimi 7 giorni (ordinati per inizio)."""
+        return self._memoize("upcoming_events", self._compute_upcoming_events)
 
-    @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def _compute_upcoming_events(self) -> List[EventRecord]:
+        """Interroga l'indice del coordinator per i prossimi 7 giorni."""
+        now = dt_util.utcnow()
+        return self.coordinator.events_between(now, now + timedelta(days=7))
+
+    def _build_attributes(self) -> Dict[str, Any]:
         """Attributi aggiuntivi per gli eventi prossimi."""
-        attrs = super().extra_state_attributes
+        attrs = super()._build_attributes()
         
         upcoming_events = self._get_upcoming_events()
         events_list = []
         
-        for event in upcoming_events[:10]:  # Limita a 10 eventi
+        for record in upcoming_events[:10]:  # Limita a 10 eventi
+            event = record.event
             event_attr = {
                 ATTR_SUMMARY: event.get("summary", ""),
-                ATTR_CALENDAR_NAME: event.get("calendar_name", ""),
+                ATTR_CALENDAR_NAME: record.calendar_id,
                 ATTR_START_TIME: self._format_event_time(event.get("start", {})),
                 ATTR_END_TIME: self._format_event_time(event.get("end", {})),
             }
@@ -334,119 +345,27 @@ class BetterCalendarDayBase(BetterCalendarSensorBase):
         day_events = self._get_day_events()
         return len(day_events)
 
-    def _get_day_events(self) -> List[Dict[str, Any]]:
+    def _get_day_events(self) -> Tuple[EventRecord, ...]:
         """Ottieni eventi per il giorno specificato."""
-        data = self._load_events_from_file()
-        events_data = data.get("events", {})
-        
-        # Calcola la data target
-        target_date = dt_util.utcnow() + timedelta(days=self._day_offset)
-        target_date_str = target_date.strftime("%Y-%m-%d")
-        
-        day_events = []
-        for calendar_id, events in events_data.items():
-            for event in events:
-                if self._is_event_in_day(event, target_date_str):
-                    day_events.append(event)
-        
-        return day_events
+        return self._memoize("day_events", self._compute_day_events)
 
-    def _is_event_in_day(self, event: Dict[str, Any], target_date_str: str) -> bool:
-        """Controlla se l'evento è nel giorno specificato."""
-        start_info = event.get("start", {})
-        
-        if not start_info:
-            return False
-        
-        # Controlla il tipo di start_info
-        if isinstance(start_info, str):
-            # Se start_info è una stringa, potrebbe essere un formato di data diretto
-            # Prova a gestire come data ISO
-            if "T" in start_info:
-                # Formato datetime: 2025-08-17T16:00:00+02:00
-                event_date = start_info.split("T")[0]
-            else:
-                # Formato solo data: 2025-06-27
-                event_date = start_info[:10] if len(start_info) >= 10 else start_info
-            
-            return event_date == target_date_str
-        
-        # Caso normale: start_info è un dizionario
-        elif isinstance(start_info, dict):
-            # Caso 1: Evento all-day con campo "date"
-            if "date" in start_info:
-                event_date = start_info["date"]
-                return event_date == target_date_str
-            
-            # Caso 2: Evento con orario con campo "dateTime"
-            elif "dateTime" in start_info:
-                event_datetime_str = start_info["dateTime"]
-                # Estrai solo la data (rimuovi l'ora e timezone)
-                if "T" in event_datetime_str:
-                    event_date = event_datetime_str.split("T")[0]
-                else:
-                    event_date = event_datetime_str[:10]
-                
-                return event_date == target_date_str
-            
-            else:
-                return False
+    def _compute_day_events(self) -> Tuple[EventRecord, ...]:
+        """Legge il gruppo di eventi del giorno dal coordinator."""
+        # Calcola la data target nel fuso orario di Home Assistant
+        target_date = dt_util.now().date() + timedelta(days=self._day_offset)
         
-        else:
-            return False
+        # Il coordinator raggruppa già gli eventi per giorno locale
+        return self.coordinator.events_on_day(target_date)
 
-    def _get_event_start_datetime(self, event: Dict[str, Any]) -> Optional[datetime]:
-        """Ottieni la data/ora di inizio dell'evento."""
-        start_info = event.get("start", {})
-        
-        # Se start_info è una stringa, gestiscila direttamente
-        if isinstance(start_info, str):
-            try:
-                if "T" in start_info:
-                    # Formato datetime: 2025-08-17T16:00:00+02:00
-                    dt = datetime.fromisoformat(start_info.replace("Z", "+00:00"))
-                    # Assicurati che abbia timezone
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=dt_util.UTC)
-                    return dt
-                else:
-                    # Formato solo data: 2025-06-27 - aggiungi timezone UTC
-                    dt = datetime.fromisoformat(start_info + "T00:00:00")
-                    return dt.replace(tzinfo=dt_util.UTC)
-            except Exception as e:
-                return None
-        
-        # Caso normale: start_info è un dizionario
-        elif isinstance(start_info, dict):
-            if "dateTime" in start_info:
-                try:
-                    dt = datetime.fromisoformat(start_info["dateTime"].replace("Z", "+00:00"))
-                    # Assicurati che abbia timezone
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=dt_util.UTC)
-                    return dt
-                except:
-                    parsed_dt = dt_util.parse_datetime(start_info["dateTime"])
-                    return parsed_dt if parsed_dt else None
-            elif "date" in start_info:
-                try:
-                    dt = datetime.fromisoformat(start_info["date"] + "T00:00:00")
-                    return dt.replace(tzinfo=dt_util.UTC)
-                except:
-                    date_obj = dt_util.parse_date(start_info["date"])
-                    return dt_util.start_of_local_day(date_obj) if date_obj else None
-        
-        return None
-
-    @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def _build_attributes(self) -> Dict[str, Any]:
         """Attributi aggiuntivi per gli eventi del giorno."""
-        attrs = super().extra_state_attributes
+        attrs = super()._build_attributes()
         
         day_events = self._get_day_events()
         events_list = []
         
-        for event in day_events:
+        for record in day_events:
+            event = record.event
             event_attr = {
                 ATTR_SUMMARY: event.get("summary", ""),
                 ATTR_CALENDAR_NAME: event.get("calendar_name", ""),
@@ -521,123 +440,38 @@ class BetterCalendarThisWeek(BetterCalendarSensorBase):
         week_events = self._get_week_events()
         return len(week_events)
 
-    def _get_week_events(self) -> List[Dict[str, Any]]:
-        """Ottieni eventi di questa settimana dal file JSON."""
-        data = self._load_events_from_file()
-        events_data = data.get("events", {})
-        
-        now = dt_util.utcnow()
-        # Inizio settimana (lunedì)
-        start_of_week = now - timedelta(days=now.weekday())
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-        # Fine settimana (domenica)
-        end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
-        
-        week_events = []
-        start_date_str = start_of_week.date().isoformat()
-        end_date_str = end_of_week.date().isoformat()
-        
-        for calendar_id, events in events_data.items():
-            for event in events:
-                if self._is_event_in_week(event, start_date_str, end_date_str):
-                    # Aggiungi info calendario
-                    event_copy = event.copy()
-                    calendar_info = data.get("calendars", {}).get(calendar_id, {})
-                    event_copy["calendar_name"] = calendar_info.get("name", calendar_id)
-                    week_events.append(event_copy)
-        
-        # Ordina per data di inizio
-        week_events.sort(key=lambda x: self._get_event_start_datetime(x))
-        return week_events
+    def _get_week_events(self) -> List[EventRecord]:
+        """Ottieni eventi di questa settimana."""
+        return self._memoize("week_events", self._compute_week_events)
 
-    def _is_event_in_week(self, event: Dict[str, Any], start_date_str: str, end_date_str: str) -> bool:
-        """Controlla se un evento è in questa settimana."""
-        start_info = event.get("start", {})
-        
-        # Se start_info è una stringa, gestiscila direttamente
-        if isinstance(start_info, str):
-            try:
-                if "T" in start_info:
-                    # Formato datetime: 2025-08-17T16:00:00+02:00
-                    event_datetime = datetime.fromisoformat(start_info.replace("Z", "+00:00"))
-                    event_date_str = event_datetime.date().isoformat()
-                else:
-                    # Formato solo data: 2025-06-27
-                    event_date_str = start_info
-                
-                return start_date_str <= event_date_str <= end_date_str
-                
-            except Exception as e:
-                return False
+    def _compute_week_events(self) -> List[EventRecord]:
+        """Unisce i gruppi giornalieri della settimana corrente."""
+        start_of_week = self._get_start_of_week()
         
-        # Caso normale: start_info è un dizionario
-        if "date" in start_info:
-            # Evento tutto il giorno
-            event_date_str = start_info["date"]
-            return start_date_str <= event_date_str <= end_date_str
-        elif "dateTime" in start_info:
-            # Evento con orario
-            try:
-                event_datetime = datetime.fromisoformat(start_info["dateTime"].replace("Z", "+00:00"))
-                event_date_str = event_datetime.date().isoformat()
-                return start_date_str <= event_date_str <= end_date_str
-            except Exception as e:
-                return False
+        # Unisci i giorni della settimana: un evento su più giorni va contato una sola volta
+        week_events: Dict[int, EventRecord] = {}
+        for day_offset in range(7):
+            for record in self.coordinator.events_on_day(start_of_week + timedelta(days=day_offset)):
+                week_events.setdefault(id(record), record)
         
-        return False
+        return sorted(week_events.values(), key=lambda record: record.start_ts)
 
-    def _get_event_start_datetime(self, event: Dict[str, Any]) -> datetime:
-        """Ottieni la data/ora di inizio dell'evento."""
-        start_info = event.get("start", {})
-        
-        # Se start_info è una stringa, gestiscila direttamente
-        if isinstance(start_info, str):
-            try:
-                if "T" in start_info:
-                    # Formato datetime: 2025-08-17T16:00:00+02:00
-                    dt = datetime.fromisoformat(start_info.replace("Z", "+00:00"))
-                    # Assicurati che abbia timezone
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=dt_util.UTC)
-                    return dt
-                else:
-                    # Formato solo data: 2025-06-27 - aggiungi timezone UTC
-                    dt = datetime.fromisoformat(start_info + "T00:00:00")
-                    return dt.replace(tzinfo=dt_util.UTC)
-            except Exception as e:
-                return dt_util.utcnow()
-        
-        # Caso normale: start_info è un dizionario
-        if "dateTime" in start_info:
-            try:
-                dt = datetime.fromisoformat(start_info["dateTime"].replace("Z", "+00:00"))
-                # Assicurati che abbia timezone
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=dt_util.UTC)
-                return dt
-            except Exception as e:
-                return dt_util.utcnow()
-        elif "date" in start_info:
-            try:
-                # Evento tutto il giorno - aggiungi timezone UTC
-                dt = datetime.fromisoformat(start_info["date"] + "T00:00:00")
-                return dt.replace(tzinfo=dt_util.UTC)
-            except Exception as e:
-                return dt_util.utcnow()
-        else:
-            return dt_util.utcnow()
+    def _get_start_of_week(self) -> date:
+        """Restituisce il lunedì della settimana corrente (ora locale)."""
+        today = dt_util.now().date()
+        return today - timedelta(days=today.weekday())
 
-    @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def _build_attributes(self) -> Dict[str, Any]:
         """Attributi aggiuntivi del sensore this week."""
-        attrs = super().extra_state_attributes
+        attrs = super()._build_attributes()
         
         week_events = self._get_week_events()
         
         # Aggiungi informazioni sui primi 10 eventi
         events_info = []
-        for event in week_events[:10]:  # Limita a 10 eventi per non sovraccaricare
-            start_time = self._format_event_time(event.get("start", {}))
+        for record in week_events[:10]:  # Limita a 10 eventi per non sovraccaricare
+            event = record.event
+            start_time = self._format_record_time(record)
             end_time = self._format_event_time(event.get("end", {}))
             
             event_info = {
@@ -646,16 +480,23 @@ class BetterCalendarThisWeek(BetterCalendarSensorBase):
                 ATTR_LOCATION: event.get("location", ""),
                 ATTR_START_TIME: start_time,
                 ATTR_END_TIME: end_time,
-                ATTR_CALENDAR_NAME: event.get("calendar_name", ""),
+                ATTR_CALENDAR_NAME: record.calendar_id,
             }
             events_info.append(event_info)
         
         attrs["events"] = events_info
-        attrs["week_start"] = (dt_util.utcnow() - timedelta(days=dt_util.utcnow().weekday())).date().isoformat()
-        attrs["week_end"] = ((dt_util.utcnow() - timedelta(days=dt_util.utcnow().weekday())) + timedelta(days=6)).date().isoformat()
+        start_of_week = self._get_start_of_week()
+        attrs["week_start"] = start_of_week.isoformat()
+        attrs["week_end"] = (start_of_week + timedelta(days=6)).isoformat()
         
         return attrs
 
+    def _format_record_time(self, record: EventRecord) -> str:
+        """Formatta l'orario di inizio di un record."""
+        if record.all_day:
+            return "Tutto il giorno"
+        return record.local_start.strftime("%H:%M")
+
     def _format_event_time(self, time_data: Dict[str, Any]) -> Optional[str]:
         """Formatta l'orario dell'evento."""
         if isinstance(time_data, str):
@@ -676,55 +517,44 @@ class BetterCalendarThisWeek(BetterCalendarSensorBase):
 class BetterCalendarNotifications(BetterCalendarSensorBase):
     """Sensore per gestire le notifiche programmate."""
 
+    # minutes_until_notification cambia a ogni minuto
+    _time_trigger = {"second": 0}
+
     def __init__(self, coordinator: BetterCalendarCoordinator) -> None:
         """Inizializza il sensore notifiche."""
         super().__init__(coordinator, "notifications")
         self._attr_icon = "mdi:bell-ring"
-        self._notifications_file = None
+        self._store = None
+        self._legacy_notifications_file = None
+        self._save_pending = False
         self._notifications_data = {}
+        # Indice uid / (titolo, inizio) -> notifiche, aggiornato a ogni modifica
+        self._index = NotificationIndex()
         self._running = False
+        # Coda per orario di invio: un solo timer, armato sulla notifica più vicina
+        self._scheduler = NotificationScheduler()
+        # Stessa struttura ordinata per la pulizia: chiave = momento in cui la notifica diventa obsoleta
+        self._expiry = NotificationScheduler()
         self._unsub_timer = None
+        self._timer_due_ts: Optional[float] = None
+        # Notifiche già inviate (-> orario di invio) e ultimo controllo riuscito, salvati nello store
+        self._sent: Dict[str, float] = {}
+        # Latenze degli ultimi invii (ms), esposte negli attributi
+        self._send_latencies_ms: deque = deque(maxlen=50)
+        self._last_tick_ts: Optional[float] = None
         self._unsub_cleanup_timer = None
-        self._init_notifications_file()
-
-    def _init_notifications_file(self) -> None:
-        """Inizializza il file delle notifiche SEPARATO."""
-        # Usa la stessa directory del coordinator
-        component_dir = os.path.dirname(__file__)
-        
-        # Prova a ottenere l'entry_id in vari modi
-        entry_id = None
-        
-        # Opzione 1: dal coordinator direttamente
-        if hasattr(self.coordinator, 'entry_id'):
-            entry_id = self.coordinator.entry_id
-        
-        # Opzione 2: dal hass data se il coordinator ha config_entry
-        elif hasattr(self.coordinator, 'config_entry') and self.coordinator.config_entry:
-            entry_id = self.coordinator.config_entry.entry_id
-            
-        # Opzione 3: cerca negli eventi esistenti per derivare l'entry_id
-        elif os.path.exists(component_dir):
-            for filename in os.listdir(component_dir):
-                if filename.startswith("better_calendar_events_") and filename.endswith(".json"):
-                    # Estrai l'entry_id dal nome file degli eventi
-                    entry_id = filename.replace("better_calendar_events_", "").replace(".json", "")
-                    break
-        
-        # Fallback
-        if not entry_id:
-            entry_id = "01JYYMT61YXPANV9ND60M6NPFS"  # Usa l'entry_id che vedo nei file esistenti
-            
-        self._notifications_file = os.path.join(component_dir, f"better_calendar_notifications_{entry_id}.json")
-        
-        # Crea il file se non esiste
-        if not os.path.exists(self._notifications_file):
-            try:
-                with open(self._notifications_file, 'w', encoding='utf-8') as f:
-                    json.dump({}, f, ensure_ascii=False, indent=2)
-                _LOGGER.info(f"✅ Creato file notifiche separato: {self._notifications_file}")
-            except Exception as e:
-                _LOGGER.error(f"❌ Errore creando file notifiche: {e}")
+        # Client websocket in ascolto delle modifiche alle notifiche
+        self._notification_listeners: List[Callable[[Dict[str, Dict[str, Any]], List[str]], None]] = []
+        self._init_notifications_store()
+
+    def _init_notifications_store(self) -> None:
+        """Inizializza lo store delle notifiche in .storage."""
+        entry_id = self.coordinator.entry_id
+        self._store = notifications_store(self.coordinator.hass, entry_id)
+        # Vecchio file nella directory del componente, migrato al primo avvio
+        self._legacy_notifications_file = os.path.join(
+            os.path.dirname(__file__), f"better_calendar_notifications_{entry_id}.json"
+        )
 
     async def async_added_to_hass(self) -> None:
         """Chiamato quando il sensore viene aggiunto a Home Assistant."""
@@ -736,27 +566,30 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
         # Avvia il sistema di controllo notifiche
         await self._start_notification_system()
 
+    @callback
+    def _async_time_changed(self, now: datetime) -> None:
+        """Riscrive lo stato solo se ci sono notifiche di cui aggiornare l'attesa."""
+        if self._notifications_data:
+            self.async_write_ha_state()
+
     async def _load_notifications(self) -> None:
-        """Carica le notifiche dal file separato."""
+        """Carica le notifiche dallo store."""
         try:
-            # Carica le notifiche dal file separato
-            if os.path.exists(self._notifications_file):
-                def _read_file():
-                    with open(self._notifications_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                
-                notifications_data = await self.hass.async_add_executor_job(_read_file)
-                self._notifications_data = notifications_data
-                
-                # Auto-pulisci notifiche scadute
-                await self._cleanup_expired_notifications()
-                
-            else:
-                self._notifications_data = {}
+            stored_data = await self._store.async_load_or_import(self._legacy_notifications_file)
+            stored_data = stored_data or {}
+            self._notifications_data = stored_data.get("notifications", {})
+            self._sent = stored_data.get("sent", {})
+            self._last_tick_ts = stored_data.get("last_tick")
+            self._index.rebuild(self._notifications_data)
+            self._rebuild_expiry()
+            
+            # Auto-pulisci notifiche scadute
+            await self._cleanup_expired_notifications()
                 
         except Exception as e:
-            _LOGGER.error(f"❌ Errore caricando notifiche dal file separato: {e}")
+            _LOGGER.error(f"❌ Errore caricando notifiche: {e}")
             self._notifications_data = {}
+            self._index.rebuild(self._notifications_data)
 
     def _extract_event_start(self, event_start: Dict[str, Any]) -> str:
         """Estrai la data/ora di inizio dall'evento."""
@@ -767,84 +600,98 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
         else:
             return ""
 
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Dati delle notifiche da scrivere nello store."""
+        self._save_pending = False
+        # Copia: lo store può serializzare i dati fuori dal loop
+        return {
+            "notifications": {
+                notif_id: dict(notification) for notif_id, notification in self._notifications_data.items()
+            },
+            "sent": dict(self._sent),
+            "last_tick": self._last_tick_ts,
+        }
+
     async def _save_notifications(self) -> None:
-        """Salva le notifiche nel file separato."""
+        """Pianifica il salvataggio delle notifiche (più modifiche ravvicinate = una scrittura)."""
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, NOTIFICATIONS_SAVE_DELAY)
+
+    async def _flush_notifications(self, force: bool = False) -> None:
+        """Scrive subito le eventuali modifiche ancora in attesa di salvataggio."""
+        if not self._save_pending and not force:
+            return
         try:
-            def _write_file():
-                with open(self._notifications_file, 'w', encoding='utf-8') as f:
-                    json.dump(self._notifications_data, f, ensure_ascii=False, indent=2, default=str)
-            
-            await self.hass.async_add_executor_job(_write_file)
-            
+            await self._store.async_save(self._data_to_save())
         except Exception as e:
-            _LOGGER.error(f"❌ Errore salvando notifiche nel file separato: {e}")
+            _LOGGER.error(f"❌ Errore salvando notifiche: {e}")
+
+    def _get_expiry_ts(self, notification: Dict[str, Any]) -> float:
+        """Momento in cui la notifica diventa obsoleta: evento iniziato o invio scaduto da 2 ore."""
+        event_start_ts = notification.get("event_start_ts")
+        due_ts = notification.get("due_ts")
+        if event_start_ts is not None and due_ts is not None:
+            return min(event_start_ts, due_ts + NOTIFICATION_EXPIRY_HOURS * 3600)
+        
+        # Orario non valido: si tiene al massimo 7 giorni dalla creazione
+        try:
+            created_at = datetime.fromisoformat(notification.get("created_at", ""))
+            if created_at.tzinfo is None:
+                created_at = dt_util.as_utc(created_at)
+            return (created_at + timedelta(days=7)).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+
+    @callback
+    def _rebuild_expiry(self) -> None:
+        """Ricostruisce la coda di pulizia da tutte le notifiche (al caricamento)."""
+        self._expiry.clear()
+        for notif_id, notification in self._notifications_data.items():
+            self._expiry.schedule(notif_id, self._get_expiry_ts(notification))
+
+    @callback
+    def _forget_notification(self, notif_id: str) -> None:
+        """Rimuove una notifica dai dati locali, dalle code e dall'indice."""
+        del self._notifications_data[notif_id]
+        self._scheduler.unschedule(notif_id)
+        self._expiry.unschedule(notif_id)
+        self._index.remove(notif_id)
 
     async def _cleanup_expired_notifications(self) -> None:
-        """Rimuove le notifiche scadute e vecchie."""
+        """Rimuove le notifiche scadute e vecchie (solo quelle oltre la propria scadenza)."""
         try:
-            now = dt_util.utcnow()
-            expired_notifications = []
-            passed_event_notifications = []
-            very_old_notifications = []
+            now_ts = dt_util.utcnow().timestamp()
+            # Le notifiche non ancora inviate restano finché sono entro la tolleranza di invio
+            # (anche prima che la coda sia ricostruita, es. alla pulizia di avvio)
+            pending_horizon = self._get_catch_up_horizon(now_ts)
+            all_removed = []
             
-            _LOGGER.debug(f"🧹 Avvio pulizia notifiche - Totale notifiche: {len(self._notifications_data)}")
-            
-            for notif_id, notification in self._notifications_data.items():
-                try:
-                    # Calcola quando doveva essere inviata la notifica
-                    event_start_str = notification['event_start'].replace('Z', '+00:00')
-                    event_start = datetime.fromisoformat(event_start_str)
-                    
-                    # Assicurati che event_start sia timezone-aware come now
-                    if event_start.tzinfo is None:
-                        event_start = dt_util.as_utc(event_start)
-                    
-                    offset_minutes = notification['offset_minutes']
-                    notification_time = event_start - timedelta(minutes=offset_minutes)
-                    
-                    # Pulizia aggressiva per notifiche molto vecchie (più di 7 giorni)
-                    if notification_time < now - timedelta(days=7):
-                        very_old_notifications.append(notif_id)
-                        continue
-                    
-                    # Pulizia per eventi già passati (l'evento è finito)
-                    if event_start < now:
-                        passed_event_notifications.append(notif_id)
-                        _LOGGER.info(f"🗑️ Evento passato: {notification.get('event_summary')} - Rimuovo notifica {notif_id}")
-                        continue
-                    
-                    # Pulizia notifiche scadute da più di 2 ore
-                    if notification_time < now - timedelta(hours=2):
-                        expired_notifications.append(notif_id)
-                        _LOGGER.info(f"⏰ Notifica scaduta: {notification.get('event_summary')} - Rimuovo notifica {notif_id}")
-                        
-                except Exception as e:
-                    _LOGGER.warning(f"⚠️ Errore parsing notifica {notif_id}: {e}")
-                    # Se c'è un errore nel parsing, rimuovi notifiche molto vecchie per creazione
-                    try:
-                        created_at_str = notification.get("created_at", "")
-                        created_at = datetime.fromisoformat(created_at_str)
-                        
-                        # Assicurati che created_at sia timezone-aware come now
-                        if created_at.tzinfo is None:
-                            created_at = dt_util.as_utc(created_at)
-                        
-                        if created_at < now - timedelta(days=7):
-                            very_old_notifications.append(notif_id)
-                    except:
-                        very_old_notifications.append(notif_id)
-            
-            # Rimuovi notifiche scadute dal file separato
-            all_removed = expired_notifications + passed_event_notifications + very_old_notifications
-            
-            for notif_id in all_removed:
-                if notif_id in self._notifications_data:
-                    # Rimuove dai dati locali
-                    del self._notifications_data[notif_id]
+            for expiry_ts, notif_id in self._expiry.pop_due(now_ts):
+                notification = self._notifications_data.get(notif_id)
+                if notification is None:
+                    continue
+                
+                due_ts = notification.get("due_ts")
+                if (
+                    notif_id not in self._sent
+                    and notification.get("enabled", True)
+                    and due_ts is not None
+                    and due_ts >= pending_horizon
+                ):
+                    # Ricontrollata quando esce dalla tolleranza
+                    self._expiry.schedule(notif_id, due_ts + self._get_grace_seconds() + 1)
+                    continue
+                
+                _LOGGER.info(f"🗑️ Notifica obsoleta: {notification.get('event_summary')} - Rimuovo notifica {notif_id}")
+                self._forget_notification(notif_id)
+                all_removed.append(notif_id)
             
             # Salva il file aggiornato se sono state rimosse notifiche
             if all_removed:
+                self._arm_timer()
                 await self._save_notifications()
+                self._publish_notifications_delta(removed_ids=all_removed)
                 _LOGGER.info(f"✅ Pulizia completata - Rimosse {len(all_removed)} notifiche obsolete")
                 
                 # Aggiorna Home Assistant
@@ -891,23 +738,22 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Attributi aggiuntivi del sensore notifiche."""
-        attrs = super().extra_state_attributes
+        # Dipendono dalle notifiche e non solo dai dati del coordinator: niente cache
+        attrs = self._build_attributes()
         
         # Aggiungi tutte le notifiche come attributi
         notifications_list = []
         now = dt_util.utcnow()
         
+        now_ts = now.timestamp()
+        
         for notif_id, notification in self._notifications_data.items():
             try:
-                event_start_str = notification['event_start'].replace('Z', '+00:00')
-                event_start = datetime.fromisoformat(event_start_str)
-                
-                # Assicurati che event_start sia timezone-aware come now
-                if event_start.tzinfo is None:
-                    event_start = dt_util.as_utc(event_start)
-                
+                # Orario di invio precalcolato: nessun parsing delle date
+                due_ts = notification['due_ts']
+                if due_ts is None:
+                    continue
                 offset_minutes = notification['offset_minutes']
-                notification_time = event_start - timedelta(minutes=offset_minutes)
                 
                 notif_info = {
                     'id': notif_id,
@@ -917,8 +763,8 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                     'notification_type': notification['notification_type'],
                     'offset_minutes': offset_minutes,
                     'target_device': notification.get('target_device', 'auto'),
-                    'notification_time': notification_time.isoformat(),
-                    'minutes_until_notification': int((notification_time - now).total_seconds() / 60),
+                    'notification_time': dt_util.utc_from_timestamp(due_ts).isoformat(),
+                    'minutes_until_notification': int((due_ts - now_ts) / 60),
                     'enabled': notification.get('enabled', True)
                 }
                 notifications_list.append(notif_info)
@@ -927,40 +773,62 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 pass
         
         # Ordina per tempo di notifica
-        notifications_list.sort(key=lambda x: x['notification_time'])
-        
-        # Aggiungi anche i dati degli eventi per accesso rapido dalla card
-        events_data = {}
-        notifications_data = {}
-        
-        try:
-            # Fallback semplice: usa sempre i dati dal coordinator se disponibili
-            if hasattr(self.coordinator, 'data') and self.coordinator.data:
-                events_data = self.coordinator.data
-            else:
-                # Se il coordinator non ha dati, non fare niente di complesso
-                events_data = {}
-            
-            # Prepara i dati delle notifiche in formato dizionario per la card
-            for notif_id, notification in self._notifications_data.items():
-                notifications_data[notif_id] = notification.copy()
-                notifications_data[notif_id]['id'] = notif_id
-                
-        except Exception as e:
-            _LOGGER.debug(f"Errore caricamento dati per attributes: {e}")
+        notifications_list.sort(key=lambda x: self._notifications_data[x['id']]['due_ts'])
         
+        # Solo conteggi e un breve riepilogo: eventi e notifiche complete sono serviti
+        # dal comando websocket better_calendar/events per non gonfiare il recorder
+        upcoming_notifications = [n for n in notifications_list if n['minutes_until_notification'] > 0]
         attrs.update({
-            'notifications': notifications_list,
+            'total_count': len(notifications_list),
             'active_count': len([n for n in notifications_list if n['enabled']]),
-            'upcoming_count': len([n for n in notifications_list if n['minutes_until_notification'] > 0]),
-            'file_path': self._notifications_file,
-            # Aggiungi i dati grezzi per la card
-            'events_data': events_data,
-            'notifications_data': notifications_data
+            'upcoming_count': len(upcoming_notifications),
+            'next_notifications': upcoming_notifications[:5],
+            'last_send_latency_ms': round(self._send_latencies_ms[-1]) if self._send_latencies_ms else None,
+            'avg_send_latency_ms': (
+                round(sum(self._send_latencies_ms) / len(self._send_latencies_ms))
+                if self._send_latencies_ms else None
+            ),
+            'file_path': self._store.path,
         })
         
         return attrs
 
+    @callback
+    def async_add_notifications_listener(
+        self, update_callback: Callable[[Dict[str, Dict[str, Any]], List[str]], None]
+    ) -> Callable[[], None]:
+        """Registra un listener per le notifiche aggiunte, modificate o rimosse."""
+        self._notification_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._notification_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _publish_notifications_delta(self, changed_ids: List[str] = (), removed_ids: List[str] = ()) -> None:
+        """Invia ai listener solo le notifiche cambiate."""
+        if not self._notification_listeners:
+            return
+        
+        changed = {
+            notif_id: {**self._notifications_data[notif_id], 'id': notif_id}
+            for notif_id in changed_ids
+            if notif_id in self._notifications_data
+        }
+        removed = list(removed_ids)
+        for listener in list(self._notification_listeners):
+            listener(changed, removed)
+
+    @callback
+    def get_notifications_data(self) -> Dict[str, Dict[str, Any]]:
+        """Restituisce tutte le notifiche (con id) per il comando websocket."""
+        notifications_data = {}
+        for notif_id, notification in self._notifications_data.items():
+            notifications_data[notif_id] = {**notification, 'id': notif_id}
+        return notifications_data
+
     async def add_notification(self, event_id: str, event_summary: str, event_start: str, 
                         notification_type: str, offset_minutes: int, target_device: str = None,
                         custom_message_push: str = None, custom_message_alexa: str = None) -> str:
@@ -974,11 +842,16 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
             # Genera ID univoco per la notifica
             notif_id = f"notif_{event_id}_{notification_type}_{offset_minutes}_{int(dt_util.utcnow().timestamp())}"
             
+            # Inizio evento e orario di invio calcolati una volta sola
+            event_start_ts, due_ts = notification_timestamps(event_start_clean, offset_minutes)
+            
             # Aggiorna i dati locali
             self._notifications_data[notif_id] = {
                 'event_id': event_id,
                 'event_summary': event_summary,
                 'event_start': event_start_clean,  # Usa l'orario senza secondi
+                'event_start_ts': event_start_ts,
+                'due_ts': due_ts,
                 'notification_type': notification_type,
                 'offset_minutes': offset_minutes,
                 'target_device': target_device or 'auto',
@@ -990,8 +863,14 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
             
             _LOGGER.info(f"➕ Aggiunta notifica per {event_summary} - Orario evento pulito: {event_start_clean}")
             
+            # Programma l'invio
+            self._index.update(notif_id, self._notifications_data[notif_id])
+            self._schedule_notification(notif_id)
+            self._arm_timer()
+            
             # Salva nel file separato
             await self._save_notifications()
+            self._publish_notifications_delta(changed_ids=[notif_id])
             
             return notif_id
             
@@ -1005,11 +884,13 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
         """Rimuove una notifica dal file separato."""
         try:
             if notification_id in self._notifications_data:
-                # Rimuove dai dati locali
-                del self._notifications_data[notification_id]
+                # Rimuove dai dati locali, dalle code e dall'indice
+                self._forget_notification(notification_id)
+                self._arm_timer()
                 
                 # Salva nel file separato
                 await self._save_notifications()
+                self._publish_notifications_delta(removed_ids=[notification_id])
                 
                 return True
             else:
@@ -1018,15 +899,21 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
         except Exception as e:
             return False
 
+    @callback
     def get_notifications_for_event(self, event_id: str) -> List[Dict[str, Any]]:
         """Ottiene tutte le notifiche per un evento specifico."""
-        notifications = []
-        for notif_id, notification in self._notifications_data.items():
-            if notification.get('event_id') == event_id:
-                notif_copy = notification.copy()
-                notif_copy['id'] = notif_id
-                notifications.append(notif_copy)
-        return notifications
+        return [
+            {**self._notifications_data[notif_id], 'id': notif_id}
+            for notif_id in sorted(self._index.ids_for_event_id(event_id))
+        ]
+
+    @callback
+    def find_notifications_for_event(self, event: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Notifiche di un evento (per uid o per titolo e inizio) tramite l'indice."""
+        return [
+            (notif_id, self._notifications_data[notif_id])
+            for notif_id in sorted(self._index.ids_for_event(event))
+        ]
 
     async def toggle_notification(self, notification_id: str) -> bool:
         """Attiva/disattiva una notifica."""
@@ -1037,9 +924,13 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 
                 # Aggiorna i dati locali
                 self._notifications_data[notification_id]['enabled'] = new_state
+                self._index.update(notification_id, self._notifications_data[notification_id])
+                self._schedule_notification(notification_id)
+                self._arm_timer()
                 
                 # Salva nel file separato
                 await self._save_notifications()
+                self._publish_notifications_delta(changed_ids=[notification_id])
                 
                 return True
             else:
@@ -1063,6 +954,74 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
             _LOGGER.error(f"❌ Errore durante pulizia forzata: {e}")
             return 0
 
+    def _get_notification_due_ts(self, notification: Dict[str, Any]) -> Optional[float]:
+        """Orario di invio (epoch UTC, al minuto) precalcolato all'aggiunta della notifica."""
+        return notification.get("due_ts")
+
+    @callback
+    def _schedule_notification(self, notif_id: str) -> None:
+        """Aggiorna le code per una notifica aggiunta, modificata o rimossa."""
+        notification = self._notifications_data.get(notif_id)
+        due_ts = self._get_notification_due_ts(notification) if notification else None
+        
+        if notification is None:
+            self._expiry.unschedule(notif_id)
+        else:
+            self._expiry.schedule(notif_id, self._get_expiry_ts(notification))
+        
+        if due_ts is None or not notification.get("enabled", True):
+            self._scheduler.unschedule(notif_id)
+        else:
+            self._scheduler.schedule(notif_id, due_ts)
+
+    def _get_grace_seconds(self) -> float:
+        """Ritardo massimo (secondi) con cui una notifica viene ancora inviata."""
+        return self.coordinator._get_option("notification_grace_minutes", DEFAULT_NOTIFICATION_GRACE) * 60
+
+    def _get_catch_up_horizon(self, now_ts: float) -> float:
+        """Orario più vecchio ancora recuperabile: ultimo controllo riuscito, al massimo la tolleranza."""
+        horizon = now_ts - self._get_grace_seconds()
+        if self._last_tick_ts is not None:
+            horizon = max(horizon, self._last_tick_ts)
+        return horizon
+
+    @callback
+    def _rebuild_schedule(self) -> None:
+        """Ricostruisce la coda da tutte le notifiche (all'avvio)."""
+        self._scheduler.clear()
+        # Dopo un riavvio si recuperano le notifiche scadute da poco e mai inviate
+        horizon = self._get_catch_up_horizon(dt_util.utcnow().timestamp())
+        
+        for notif_id, notification in self._notifications_data.items():
+            if not notification.get("enabled", True) or notif_id in self._sent:
+                continue
+            due_ts = self._get_notification_due_ts(notification)
+            if due_ts is None:
+                _LOGGER.warning(f"⚠️ Orario non valido per la notifica {notif_id}")
+                continue
+            if due_ts >= horizon:
+                self._scheduler.schedule(notif_id, due_ts)
+
+    @callback
+    def _arm_timer(self) -> None:
+        """Arma il timer sulla notifica più vicina (solo se è cambiata)."""
+        if not self._running:
+            return
+        
+        next_due_ts = self._scheduler.next_due()
+        if next_due_ts == self._timer_due_ts and self._unsub_timer:
+            return
+        
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_due_ts = next_due_ts
+        
+        if next_due_ts is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass, self._check_notifications, dt_util.utc_from_timestamp(next_due_ts)
+            )
+
     async def _start_notification_system(self) -> None:
         """Avvia il sistema di controllo notifiche."""
         if self._running:
@@ -1070,18 +1029,9 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
             
         self._running = True
         
-        # Controlla ogni minuto per notifiche da inviare
-        async def _check_wrapper(now):
-            # Forza l'azzeramento dei secondi prima di chiamare _check_notifications
-            now_clean = now.replace(second=0, microsecond=0)
-            _LOGGER.debug(f"⏰ Check notifiche al minuto esatto: {now_clean.strftime('%H:%M:00')}")
-            await self._check_notifications(now_clean)
-        
-        self._unsub_timer = async_track_time_interval(
-            self.hass,
-            _check_wrapper,
-            timedelta(minutes=1)
-        )
+        # Un timer puntuale sulla prossima notifica invece di un controllo ogni minuto
+        self._rebuild_schedule()
+        self._arm_timer()
         
         # Pulizia automatica ogni 15 minuti
         self._unsub_cleanup_timer = async_track_time_interval(
@@ -1100,6 +1050,7 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
         if self._unsub_timer:
             self._unsub_timer()
             self._unsub_timer = None
+        self._timer_due_ts = None
             
         if self._unsub_cleanup_timer:
             self._unsub_cleanup_timer()
@@ -1108,53 +1059,96 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
     async def async_will_remove_from_hass(self) -> None:
         """Chiamato quando il sensore viene rimosso."""
         await self._stop_notification_system()
+        await self._flush_notifications()
         await super().async_will_remove_from_hass()
 
-    async def _check_notifications(self, now: datetime = None) -> None:
-        """Controlla se ci sono notifiche da inviare."""
+    async def _check_notifications(self, _scheduled: datetime = None) -> None:
+        """Invia le notifiche arrivate all'orario di invio e riarma il timer.
+
+        L'argomento del timer è l'orario programmato, non quello reale: dopo un
+        ritardo del loop o una sospensione conta l'ora attuale.
+        """
+        self._unsub_timer = None
+        self._timer_due_ts = None
         if not self._running:
             return
             
-        now = now or dt_util.now()
-        # Azzera i secondi per confrontare solo ore e minuti
-        now_truncated = now.replace(second=0, microsecond=0)
+        now_ts = dt_util.utcnow().timestamp()
+        horizon = self._get_catch_up_horizon(now_ts)
         notifications_to_send = []
         
-        _LOGGER.debug(f"🔍 Controllo notifiche - Ora corrente (HH:MM): {now_truncated.strftime('%H:%M')}")
+        for due_ts, notif_id in self._scheduler.pop_due(now_ts):
+            notification = self._notifications_data.get(notif_id)
+            if notification is None or notif_id in self._sent:
+                continue
+            # La tolleranza vale dall'orario di invio originale, anche per i nuovi tentativi
+            due_ts = notification.get("due_ts", due_ts)
+            if due_ts < horizon:
+                _LOGGER.warning(
+                    f"⏰ Notifica {notif_id} ({notification.get('event_summary')}) in ritardo di "
+                    f"{int((now_ts - due_ts) / 60)} minuti, oltre la tolleranza: non inviata"
+                )
+                continue
+            notifications_to_send.append((notif_id, notification))
+            self._sent[notif_id] = due_ts
+            _LOGGER.info(
+                f"🎯 Notifica pronta: {notification.get('event_summary')} - "
+                f"Ora: {dt_util.as_local(dt_util.utc_from_timestamp(due_ts)).strftime('%H:%M')}"
+            )
+        
+        # Gli invii ormai fuori tolleranza non servono più per evitare doppioni
+        for notif_id, due_ts in list(self._sent.items()):
+            if due_ts < horizon and notif_id not in self._notifications_data:
+                del self._sent[notif_id]
         
-        for notif_id, notification in self._notifications_data.items():
-            if notification.get("enabled", True):
+        try:
+            if notifications_to_send:
+                # Registra gli invii prima di eseguirli: dopo un riavvio non verranno ripetuti
+                self._last_tick_ts = now_ts
+                await self._flush_notifications(force=True)
+            
+            # Invia le notifiche in parallelo (con un limite, per non saturare Alexa/notify)
+            if notifications_to_send:
+                semaphore = asyncio.Semaphore(MAX_CONCURRENT_NOTIFICATION_SENDS)
                 
-                # Calcola il momento dell'invio
-                try:
-                    # Converti e pulisci l'orario di inizio evento
-                    event_start_str = notification["event_start"].replace('Z', '+00:00')
-                    event_start = datetime.fromisoformat(event_start_str)
-                    
-                    # Assicurati che event_start sia timezone-aware come now
-                    if event_start.tzinfo is None:
-                        event_start = dt_util.as_utc(event_start)
-                    
-                    event_start_clean = event_start.replace(second=0, microsecond=0)
-                    
-                    # Calcola il momento della notifica e puliscilo
-                    offset_minutes = notification["offset_minutes"]
-                    notification_time = event_start_clean - timedelta(minutes=offset_minutes)
-                    notification_time_clean = notification_time.replace(second=0, microsecond=0)
-                    
-                    _LOGGER.debug(f"📅 Notifica {notification.get('event_summary')} - Orario notifica (HH:MM): {notification_time_clean.strftime('%H:%M')}")
-                    
-                    # Controlla se è il momento esatto (solo ore e minuti)
-                    if now_truncated == notification_time_clean:
-                        notifications_to_send.append((notif_id, notification))
-                        _LOGGER.info(f"🎯 Notifica pronta: {notification.get('event_summary')} - Ora: {now_truncated.strftime('%H:%M')}")
-                        
-                except Exception as e:
-                    _LOGGER.warning(f"⚠️ Errore parsing notifica {notif_id}: {e}")
+                async def _send_limited(notif_id: str, notification: Dict[str, Any]) -> bool:
+                    async with semaphore:
+                        return await self._send_notification(notif_id, notification)
+                
+                results = await asyncio.gather(
+                    *(_send_limited(notif_id, notification) for notif_id, notification in notifications_to_send)
+                )
+                await self._remove_sent_notifications(
+                    [notif_id for (notif_id, _), sent in zip(notifications_to_send, results) if sent]
+                )
+                
+                failed_ids = [notif_id for (notif_id, _), sent in zip(notifications_to_send, results) if not sent]
+                if failed_ids:
+                    # Non consegnate: non risultano inviate e si riprova finché sono entro la tolleranza
+                    retry_ts = dt_util.utcnow().timestamp() + NOTIFICATION_RETRY_SECONDS
+                    for notif_id in failed_ids:
+                        self._sent.pop(notif_id, None)
+                        if notif_id in self._notifications_data:
+                            self._scheduler.schedule(notif_id, retry_ts)
+                    await self._flush_notifications(force=True)
+        finally:
+            self._arm_timer()
+
+    async def _remove_sent_notifications(self, notif_ids: List[str]) -> None:
+        """Rimuove in blocco le notifiche inviate: un salvataggio e una scrittura di stato per controllo."""
+        removed = []
+        for notif_id in notif_ids:
+            if notif_id in self._notifications_data:
+                self._forget_notification(notif_id)
+                removed.append(notif_id)
         
-        # Invia le notifiche
-        for notif_id, notification in notifications_to_send:
-            await self._send_notification(notif_id, notification)
+        if removed:
+            _LOGGER.info(f"🗑️ Rimosse {len(removed)} notifiche dopo l'invio")
+            await self._save_notifications()
+            self._publish_notifications_delta(removed_ids=removed)
+        
+        # Aggiorna Home Assistant
+        self.async_write_ha_state()
 
     async def _periodic_cleanup(self, now: datetime = None) -> None:
         """Pulizia periodica delle notifiche obsolete."""
@@ -1166,8 +1160,9 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
         except Exception as e:
             _LOGGER.warning(f"⚠️ Errore durante pulizia periodica notifiche: {e}")
 
-    async def _send_notification(self, notif_id: str, notification: Dict[str, Any]) -> None:
-        """Invia una notifica."""
+    async def _send_notification(self, notif_id: str, notification: Dict[str, Any]) -> bool:
+        """Invia una notifica e ne registra la latenza. Restituisce True se inviata."""
+        started = time.monotonic()
         try:
             _LOGGER.info(f"🚀 Invio notifica {notif_id} per evento '{notification.get('event_summary')}'")
             
@@ -1196,7 +1191,8 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 else:
                     message = f"📅 Promemoria: '{event_summary}' inizia {offset_desc} (alle {event_time})"
                     
-                await self._send_push_notification(message, target_device)
+                if not await self._send_push_notification(message, target_device):
+                    return False
                 _LOGGER.info(f"✅ Notifica Push inviata per {event_summary}")
                 
             elif notification_type == "alexa":
@@ -1211,32 +1207,26 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 else:
                     message = f"Attenzione! L'evento '{event_summary}' inizia {offset_desc}, alle ore {event_time}"
                     
-                await self._send_alexa_notification(message, target_device)
+                if not await self._send_alexa_notification(message, target_device):
+                    return False
                 _LOGGER.info(f"🔊 Notifica Alexa inviata per {event_summary}")
             
-            # Rimuovi la notifica dopo l'invio dal file separato
-            if notif_id in self._notifications_data:
-                _LOGGER.info(f"🗑️ Rimuovo notifica {notif_id} dopo l'invio")
-                
-                # Rimuove dai dati locali
-                del self._notifications_data[notif_id]
-                
-                # Salva il file separato aggiornato
-                await self._save_notifications()
-                
-                _LOGGER.info(f"✅ Notifica {notif_id} rimossa con successo")
             else:
-                _LOGGER.warning(f"⚠️ Notifica {notif_id} non trovata nei dati locali")
+                _LOGGER.warning(f"⚠️ Tipo di notifica sconosciuto per {notif_id}: {notification_type}")
+                return False
             
-            # Aggiorna Home Assistant
-            self.async_write_ha_state()
+            return True
             
         except Exception as e:
             _LOGGER.error(f"❌ Errore inviando notifica {notif_id}: {e}")
-            pass
+            return False
+        finally:
+            latency_ms = (time.monotonic() - started) * 1000
+            self._send_latencies_ms.append(latency_ms)
+            _LOGGER.debug(f"⏱️ Notifica {notif_id} elaborata in {latency_ms:.0f} ms")
 
-    async def _send_push_notification(self, message: str, target_device: str = "auto") -> None:
-        """Invia una notifica push semplice."""
+    async def _send_push_notification(self, message: str, target_device: str = "auto") -> bool:
+        """Invia una notifica push semplice. Restituisce True se consegnata al servizio notify."""
         try:
             service_data = {
                 "message": message,
@@ -1253,7 +1243,7 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 # Verifica che il servizio esista
                 if not self.hass.services.has_service("notify", service_name):
                     _LOGGER.error(f"❌ Servizio notify.{service_name} non disponibile per notifica push!")
-                    return
+                    return False
                     
                 _LOGGER.info(f"📱 Invio notifica push a servizio: notify.{service_name}")
                 await self.hass.services.async_call(
@@ -1267,14 +1257,16 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 )
                 
             _LOGGER.info(f"✅ Notifica push inviata con successo")
+            return True
                 
         except Exception as e:
             _LOGGER.error(f"❌ Errore inviando notifica push: {e}")
             _LOGGER.error(f"❌ Tipo errore: {type(e).__name__}")
             _LOGGER.error(f"❌ Target device: {target_device}")
+            return False
 
-    async def _send_alexa_notification(self, message: str, target_device: str = "auto") -> None:
-        """Invia una notifica Alexa."""
+    async def _send_alexa_notification(self, message: str, target_device: str = "auto") -> bool:
+        """Invia una notifica Alexa. Restituisce True se consegnata al servizio notify."""
         try:
             # Se il target_device è specificato e inizia con "notify.", usa quello
             if target_device and target_device != "auto":
@@ -1292,7 +1284,7 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                     )
                     
                     _LOGGER.info(f"✅ Notifica Alexa inviata con successo tramite {target_device}")
-                    return  # Esci subito senza altri controlli
+                    return True  # Esci subito senza altri controlli
                 
                 # Per altri tipi di target, procedi con la logica normale
                 if target_device.startswith("notify."):
@@ -1316,7 +1308,7 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                         _LOGGER.info(f"🔄 Uso servizio alternativo: notify.{alexa_service}")
                     else:
                         _LOGGER.error(f"❌ Nessun servizio Alexa alternativo trovato!")
-                        return
+                        return False
                 
                 # Gestisci servizi alexa_media tradizionali
                 if alexa_service == "alexa_media":
@@ -1367,7 +1359,7 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 
                 if not alexa_services:
                     _LOGGER.error("❌ Nessun servizio Alexa trovato!")
-                    return
+                    return False
                 
                 alexa_service = alexa_services[0]
                 _LOGGER.info(f"🔊 Invio notifica Alexa tramite primo servizio trovato: notify.{alexa_service}")
@@ -1385,11 +1377,14 @@ class BetterCalendarNotifications(BetterCalendarSensorBase):
                 
                 _LOGGER.info(f"✅ Notifica Alexa inviata con successo tramite notify.{alexa_service}")
             
+            return True
+            
         except Exception as e:
             _LOGGER.error(f"❌ Errore inviando notifica Alexa: {e}")
             _LOGGER.error(f"❌ Tipo errore: {type(e).__name__}")
             _LOGGER.error(f"❌ Messaggio: {message}")
             _LOGGER.error(f"❌ Target device: {target_device}")
+            return False
 
     def _get_offset_description(self, minutes: int) -> str:
         """Converte i minuti in descrizione leggibile."""
@@ -3,7 +3,7 @@ import logging
 from typing import Any, Dict
 from datetime import datetime, timedelta
 
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.helpers import config_validation as cv
 import voluptuous as vol
 
@@ -24,8 +24,32 @@ CREATE_EVENT_SCHEMA = vol.Schema({
     vol.Optional("notification_time"): cv.positive_int,
 })
 
+CREATE_EVENTS_SCHEMA = vol.Schema({
+    vol.Required("events"): vol.All(
+        cv.ensure_list,
+        [
+            vol.Schema({
+                vol.Required("summary"): cv.string,
+                vol.Optional("description", default=""): cv.string,
+                vol.Optional("location"): cv.string,
+                vol.Required("start_datetime"): cv.string,
+                vol.Required("end_datetime"): cv.string,
+                vol.Optional("all_day", default=False): cv.boolean,
+                vol.Optional("calendar"): cv.entity_id,
+            })
+        ],
+    ),
+})
+
+IMPORT_ICS_SCHEMA = vol.Schema({
+    vol.Required("path"): cv.string,
+    vol.Required("calendar"): cv.entity_id,
+    vol.Optional("batch_size", default=100): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+})
+
 UPDATE_EVENT_SCHEMA = vol.Schema({
     vol.Required("event_id"): cv.string,
+    vol.Optional("recurrence_id"): cv.string,
     vol.Required("summary"): cv.string,
     vol.Optional("description", default=""): cv.string,
     vol.Required("start_datetime"): cv.string,
@@ -37,6 +61,7 @@ UPDATE_EVENT_SCHEMA = vol.Schema({
 
 DELETE_EVENT_SCHEMA = vol.Schema({
     vol.Required("event_id"): cv.string,
+    vol.Optional("recurrence_id"): cv.string,
 })
 
 ADD_NOTIFICATION_SCHEMA = vol.Schema({
@@ -153,6 +178,44 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         except Exception as e:
             _LOGGER.error(f"❌ Errore creando evento: {e}")
 
+    async def create_events(call: ServiceCall) -> ServiceResponse:
+        """Crea più eventi con un solo aggiornamento finale."""
+        coordinator = _get_coordinator()
+        if not coordinator:
+            _LOGGER.error("❌ Nessun coordinator trovato")
+            return {"created": 0, "failed": len(call.data["events"]), "results": []}
+        
+        results = await coordinator.async_create_events(call.data["events"])
+        created = sum(1 for result in results if result["success"])
+        
+        hass.bus.async_fire(f"{DOMAIN}_events_created", {
+            "created": created,
+            "failed": len(results) - created,
+        })
+        
+        return {"created": created, "failed": len(results) - created, "results": results}
+
+    async def import_ics(call: ServiceCall) -> ServiceResponse:
+        """Importa un file .ics in un calendario."""
+        coordinator = _get_coordinator()
+        if not coordinator:
+            _LOGGER.error("❌ Nessun coordinator trovato")
+            return {"error": "Better Calendar non configurato"}
+        
+        path = call.data["path"]
+        if not hass.config.is_allowed_path(path):
+            _LOGGER.error(f"❌ Percorso non consentito: {path} (aggiungilo a allowlist_external_dirs)")
+            return {"error": f"Percorso non consentito: {path}"}
+        
+        try:
+            stats = await coordinator.async_import_ics(path, call.data["calendar"], call.data["batch_size"])
+        except Exception as e:
+            _LOGGER.error(f"❌ Errore importando {path}: {e}")
+            return {"error": str(e)}
+        
+        hass.bus.async_fire(f"{DOMAIN}_import_completed", stats)
+        return stats
+
     async def update_event(call: ServiceCall) -> None:
         """Aggiorna un evento esistente."""
         coordinator = _get_coordinator()
@@ -163,6 +226,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         try:
             event_data = {
                 "event_id": call.data["event_id"],
+                "recurrence_id": call.data.get("recurrence_id"),
                 "summary": call.data["summary"],
                 "description": call.data.get("description", ""),
                 "start_datetime": call.data["start_datetime"],
@@ -193,7 +257,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             return
             
         try:
-            success = await coordinator.delete_event(call.data["event_id"])
+            success = await coordinator.delete_event(call.data["event_id"], call.data.get("recurrence_id"))
             
             if success:
                 hass.bus.async_fire(f"{DOMAIN}_event_deleted", {
@@ -451,6 +515,22 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         schema=CREATE_EVENT_SCHEMA,
     )
     
+    hass.services.async_register(
+        DOMAIN,
+        "create_events",
+        create_events,
+        schema=CREATE_EVENTS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        "import_ics",
+        import_ics,
+        schema=IMPORT_ICS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    
     hass.services.async_register(
         DOMAIN,
         "update_event",
@@ -533,6 +613,8 @@ async def async_unload_services(hass: HomeAssistant) -> None:
     """Rimuove i servizi Better Calendar."""
     hass.services.async_remove(DOMAIN, "force_update_calendars")
     hass.services.async_remove(DOMAIN, "create_event")
+    hass.services.async_remove(DOMAIN, "create_events")
+    hass.services.async_remove(DOMAIN, "import_ics")
     hass.services.async_remove(DOMAIN, "update_event")
     hass.services.async_remove(DOMAIN, "delete_event")
     hass.services.async_remove(DOMAIN, "add_notification")
@@ -0,0 +1,211 @@
+"""Comandi websocket per Better Calendar."""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .delta import CalendarDelta, event_key
+from .models import EventRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Registra i comandi websocket di Better Calendar."""
+    websocket_api.async_register_command(hass, websocket_get_events)
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+def _get_entry_data(hass: HomeAssistant, entry_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Restituisce i dati dell'entry richiesta (o della prima disponibile)."""
+    for current_entry_id, entry_data in hass.data.get(DOMAIN, {}).items():
+        if isinstance(entry_data, dict) and "coordinator" in entry_data:
+            if entry_id is None or current_entry_id == entry_id:
+                return entry_data
+    return None
+
+
+def _build_events_payload(
+    entry_data: Dict[str, Any],
+    start: datetime,
+    end: datetime,
+    calendars: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Prepara eventi (raggruppati per calendario) e notifiche per l'intervallo [start, end)."""
+    coordinator = entry_data["coordinator"]
+    calendar_filter = set(calendars or [])
+
+    events: Dict[str, List[Dict[str, Any]]] = {}
+    for record in coordinator.events_between(start, end):
+        if calendar_filter and record.calendar_id not in calendar_filter:
+            continue
+        events.setdefault(record.calendar_id, []).append(record.event)
+
+    notifications_sensor = entry_data.get("notifications_sensor")
+    notifications = notifications_sensor.get_notifications_data() if notifications_sensor else {}
+
+    return {
+        "events": events,
+        "notifications": notifications,
+        "generation": coordinator.generation,
+    }
+
+
+def _filter_deltas(
+    deltas: Dict[str, CalendarDelta],
+    start_ts: float,
+    end_ts: float,
+    calendars: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Limita i delta di una sincronizzazione all'intervallo di un client.
+
+    Un evento modificato che esce dall'intervallo viene inviato come rimosso.
+    """
+    calendar_filter = set(calendars or [])
+    filtered: Dict[str, Dict[str, Any]] = {}
+
+    for calendar_id, delta in deltas.items():
+        if calendar_filter and calendar_id not in calendar_filter:
+            continue
+
+        added: List[Dict[str, Any]] = []
+        changed: List[Dict[str, Any]] = []
+        removed: List[str] = list(delta.removed)
+
+        for target, events in ((added, delta.added), (changed, delta.changed)):
+            for event in events:
+                record = EventRecord.from_event(calendar_id, event)
+                in_range = record is not None and record.start_ts < end_ts and (
+                    record.end_ts > start_ts or record.start_ts >= start_ts
+                )
+                if in_range:
+                    target.append(event)
+                elif events is delta.changed:
+                    removed.append(event_key(event))
+
+        if added or changed or removed:
+            filtered[calendar_id] = {"added": added, "changed": changed, "removed": removed}
+
+    return filtered
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "better_calendar/events",
+        vol.Required("start"): cv.datetime,
+        vol.Required("end"): cv.datetime,
+        vol.Optional("calendars"): vol.All(cv.ensure_list, [cv.entity_id]),
+        vol.Optional("entry_id"): cv.string,
+    }
+)
+@callback
+def websocket_get_events(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Restituisce gli eventi di un intervallo dallo snapshot in memoria del coordinator."""
+    entry_data = _get_entry_data(hass, msg.get("entry_id"))
+    if entry_data is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Better Calendar non configurato")
+        return
+
+    # Le date senza fuso orario sono interpretate nel fuso di Home Assistant
+    start = dt_util.as_local(msg["start"])
+    end = dt_util.as_local(msg["end"])
+
+    connection.send_result(
+        msg["id"],
+        _build_events_payload(entry_data, start, end, msg.get("calendars")),
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "better_calendar/subscribe",
+        vol.Required("start"): cv.datetime,
+        vol.Required("end"): cv.datetime,
+        vol.Optional("calendars"): vol.All(cv.ensure_list, [cv.entity_id]),
+        vol.Optional("entry_id"): cv.string,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Invia uno snapshot iniziale dell'intervallo e poi solo i delta di ogni sincronizzazione."""
+    entry_data = _get_entry_data(hass, msg.get("entry_id"))
+    if entry_data is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Better Calendar non configurato")
+        return
+
+    coordinator = entry_data["coordinator"]
+    start = dt_util.as_local(msg["start"])
+    end = dt_util.as_local(msg["end"])
+    calendars = msg.get("calendars")
+    sent = {"generation": coordinator.generation}
+
+    @callback
+    def _send_snapshot() -> None:
+        payload = _build_events_payload(entry_data, start, end, calendars)
+        sent["generation"] = payload["generation"]
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"type": "snapshot", **payload})
+        )
+
+    @callback
+    def _handle_coordinator_update() -> None:
+        generation = coordinator.generation
+        if generation == sent["generation"]:
+            return
+        if generation != sent["generation"] + 1:
+            # Delta persi (es. più modifiche ravvicinate): meglio un nuovo snapshot
+            _send_snapshot()
+            return
+
+        sent["generation"] = generation
+        calendars_delta = _filter_deltas(
+            coordinator.last_deltas, start.timestamp(), end.timestamp(), calendars
+        )
+        if calendars_delta:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {"type": "events", "generation": generation, "calendars": calendars_delta},
+                )
+            )
+
+    @callback
+    def _handle_notifications_update(changed: Dict[str, Dict[str, Any]], removed: List[str]) -> None:
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {"type": "notifications", "changed": changed, "removed": removed},
+            )
+        )
+
+    unsubscribers = [coordinator.async_add_listener(_handle_coordinator_update)]
+    notifications_sensor = entry_data.get("notifications_sensor")
+    if notifications_sensor is not None:
+        unsubscribers.append(
+            notifications_sensor.async_add_notifications_listener(_handle_notifications_update)
+        )
+
+    @callback
+    def _unsubscribe() -> None:
+        for unsubscribe in unsubscribers:
+            unsubscribe()
+
+    connection.subscriptions[msg["id"]] = _unsubscribe
+    connection.send_result(msg["id"])
+    _send_snapshot()
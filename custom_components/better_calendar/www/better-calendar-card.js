@@ -52,6 +52,9 @@ class BetterCalendarCard extends LitElement {
     this._hasTriedRefresh = false; // Flag per evitare refresh multipli
     this._primaryCalendar = null;
     this._syncTimer = null;
+    this._unsubscribe = null; // Sottoscrizione websocket better_calendar/subscribe
+    this._subscriptionRange = null;
+    this._hasSnapshot = false;
     this._theme = 'dark';
     this._isConfigured = false; // Indica se la card è stata configurata
     this._availableCalendars = []; // Calendari disponibili nel sistema
@@ -4621,38 +4624,150 @@ class BetterCalendarCard extends LitElement {
   }
 
   _startAutoSync() {
-    // Cancella timer esistente se presente
+    // Cancella la sottoscrizione esistente se presente
     this._stopAutoSync();
 
-    let syncCounter = 0;
+    // Nessun polling: il server invia i delta a ogni sincronizzazione del coordinator
+    this._ensureSubscription();
+  }
 
-    // Sincronizza ogni 30 secondi, con refresh Better Calendar ogni 5 minuti
-    this._syncTimer = setInterval(async () => {
-      if (this._hass && this._calendars && this._calendars.length > 0) {
-        syncCounter++;
+  _stopAutoSync() {
+    if (this._syncTimer) {
+      clearInterval(this._syncTimer);
+      this._syncTimer = null;
+    }
+
+    this._subscriptionRange = null;
+    if (this._unsubscribe) {
+      const unsubscribe = this._unsubscribe;
+      this._unsubscribe = null;
+      // La sottoscrizione potrebbe essere ancora in attesa di conferma
+      unsubscribe.then(unsub => unsub()).catch(() => {});
+    }
+  }
 
-        // Ogni 30 secondi: ricarica eventi dalla card
-        // Sincronizzazione automatica
-        this._fetchEvents();
+  _ensureSubscription() {
+    if (!this._hass || !this._hass.connection || !this._calendars || this._calendars.length === 0) {
+      return;
+    }
 
-        // Ogni 5 minuti (10 cicli da 30s): refresh completo del Better Calendar
-        if (syncCounter >= 10) {
+    // Risottoscrivi solo se l'intervallo visibile è cambiato
+    const { start, end } = this._getVisibleRange();
+    const rangeKey = `${start.toISOString()}|${end.toISOString()}`;
+    if (this._unsubscribe && this._subscriptionRange === rangeKey) {
+      return;
+    }
 
-          await this._refreshBetterCalendar();
-          syncCounter = 0;
-        }
+    this._stopAutoSync();
+    this._subscriptionRange = rangeKey;
+    this._hasSnapshot = false;
+
+    this._unsubscribe = this._hass.connection.subscribeMessage(
+      message => this._handleSubscriptionMessage(message),
+      {
+        type: 'better_calendar/subscribe',
+        start: start.toISOString(),
+        end: end.toISOString()
       }
-    }, 30000); // 30 secondi
+    );
+    this._unsubscribe.catch(error => {
+      console.warn('⚠️ Sottoscrizione Better Calendar non disponibile:', error);
+      this._unsubscribe = null;
+      this._subscriptionRange = null;
+    });
+  }
 
+  async _handleSubscriptionMessage(message) {
+    if (message.type === 'snapshot') {
+      // Il primo snapshot coincide con i dati appena caricati: aggiorna solo le notifiche
+      if (!this._hasSnapshot) {
+        this._hasSnapshot = true;
+        this._notificationsData = message.notifications || {};
+        await this._refreshEventNotifications();
+        return;
+      }
+
+      // Snapshot successivi: alcuni delta sono andati persi, ricarica l'intervallo
+      this._fetchEvents();
+      return;
+    }
 
+    if (message.type === 'events') {
+      this._applyEventsDelta(message.calendars || {});
+      await this._refreshEventNotifications();
+      return;
+    }
+
+    if (message.type === 'notifications') {
+      const notificationsData = { ...(this._notificationsData || {}) };
+      for (const [notifId, notification] of Object.entries(message.changed || {})) {
+        notificationsData[notifId] = notification;
+      }
+      for (const notifId of message.removed || []) {
+        delete notificationsData[notifId];
+      }
+      this._notificationsData = notificationsData;
+      await this._refreshEventNotifications();
+    }
   }
 
-  _stopAutoSync() {
-    if (this._syncTimer) {
-      clearInterval(this._syncTimer);
-      this._syncTimer = null;
+  _getEventKey(uid, recurrenceId, start) {
+    return `${uid}|${recurrenceId || start}`;
+  }
+
+  _applyEventsDelta(calendarsDelta) {
+    let events = [...(this._events || [])];
+
+    for (const [calendarId, delta] of Object.entries(calendarsDelta)) {
+      const calendar = this._calendars.find(cal => cal.entity_id === calendarId);
+      if (!calendar) continue;
 
+      const incoming = [...(delta.added || []), ...(delta.changed || [])].map(ev => this._toCardEvent(ev, calendar));
+      const replacedKeys = new Set([
+        ...(delta.removed || []),
+        ...incoming.map(ev => this._getEventKey(ev.id, ev.recurrence_id, ev.start))
+      ]);
+
+      events = events.filter(ev =>
+        ev.calendar !== calendarId ||
+        !replacedKeys.has(this._getEventKey(ev.id, ev.recurrence_id, ev.start))
+      );
+      events.push(...incoming);
+    }
+
+    this._events = events;
+  }
+
+  _toCardEvent(ev, calendar) {
+    // Stesso formato degli eventi caricati in _loadEventsFromHomeAssistant
+    const startDate = this._getCalendarDate(ev.start);
+    const endDate = this._getCalendarDate(ev.end);
+    const isAllDay = startDate && !startDate.includes('T');
+
+    return {
+      id: ev.uid || `${ev.summary}_${startDate}_${Date.now()}`,
+      summary: ev.summary,
+      description: ev.description || '',
+      start: startDate,
+      end: endDate,
+      isAllDay: isAllDay,
+      backgroundColor: calendar.backgroundColor,
+      calendar: calendar.entity_id,
+      recurrence_id: ev.recurrence_id,
+      rrule: ev.rrule,
+      isLocal: false,
+      isEditable: calendar.entity_id === this._primaryCalendar,
+      notifications: [],
+      source: 'home_assistant'
+    };
+  }
+
+  async _refreshEventNotifications() {
+    // Riassocia le notifiche correnti agli eventi già caricati
+    if (this._events && this._events.length > 0) {
+      this._events = await this._mergeEventsWithNotifications(this._events, null);
     }
+    this.requestUpdate();
   }
 
   async _refreshBetterCalendar() {
@@ -4803,6 +4918,11 @@ class BetterCalendarCard extends LitElement {
       // Usa il sistema di aggiornamento di LitElement
       super.requestUpdate();
 
+      // Ricevi i cambiamenti dell'intervallo visibile (nuova sottoscrizione se è cambiato)
+      if (this._isConfigured) {
+        this._ensureSubscription();
+      }
+
     } finally {
       this._isFetchingEvents = false;
     }
@@ -4817,26 +4937,7 @@ class BetterCalendarCard extends LitElement {
     }
 
     // Calcola l'intervallo di date da richiedere in base alla vista corrente
-    let start, end;
-
-    if (this._selectedView === 'weekly') {
-      // In vista settimanale carichiamo sempre da lunedì a domenica della settimana corrente
-      start = this._getStartOfWeek(this._currentDate);
-      end = new Date(start);
-      end.setDate(start.getDate() + 6); // ultimo giorno (domenica)
-    } else if (this._selectedView === 'daily') {
-      // In vista giornaliera basta il singolo giorno
-      start = new Date(this._currentDate);
-      end = new Date(this._currentDate);
-    } else {
-      // Vista mensile (o default) – intero mese
-      start = new Date(this._currentDate.getFullYear(), this._currentDate.getMonth(), 1);
-      end = new Date(this._currentDate.getFullYear(), this._currentDate.getMonth() + 1, 0);
-    }
-
-    // Normalizza orario di inizio/fine giorno
-    start.setHours(0, 0, 0, 0);
-    end.setHours(23, 59, 59, 999);
+    const { start, end } = this._getVisibleRange();
     const params = `?start=${start.toISOString()}&end=${end.toISOString()}`;
 
     for (const calendar of this._calendars) {
@@ -4881,51 +4982,67 @@ class BetterCalendarCard extends LitElement {
     return events;
   }
 
-  async _loadBetterCalendarData() {
-    // Approccio semplificato: carica direttamente dal sensore delle notifiche
-    try {
-      // Prima prova a caricare i dati dal sensore notifiche
-      let eventsData = { events: {}, calendars: {} };
-      let notificationsData = {};
+  _getVisibleRange() {
+    let start, end;
 
-      // Cerca il sensore delle notifiche per ottenere i dati
-      const entities = Object.keys(this._hass.states);
-      const notificationsSensorId = entities.find(id =>
-        id.includes('better_calendar') && id.includes('notifications')
-      );
+    if (this._selectedView === 'weekly') {
+      // In vista settimanale carichiamo sempre da lunedì a domenica della settimana corrente
+      start = this._getStartOfWeek(this._currentDate);
+      end = new Date(start);
+      end.setDate(start.getDate() + 6); // ultimo giorno (domenica)
+    } else if (this._selectedView === 'daily') {
+      // In vista giornaliera basta il singolo giorno
+      start = new Date(this._currentDate);
+      end = new Date(this._currentDate);
+    } else {
+      // Vista mensile (o default) – intero mese
+      start = new Date(this._currentDate.getFullYear(), this._currentDate.getMonth(), 1);
+      end = new Date(this._currentDate.getFullYear(), this._currentDate.getMonth() + 1, 0);
+    }
 
-      if (notificationsSensorId) {
-        const notificationsSensor = this._hass.states[notificationsSensorId];
-        if (notificationsSensor && notificationsSensor.attributes) {
-          // Prova a ottenere i dati dal sensore
-          eventsData = notificationsSensor.attributes.events_data || { events: {}, calendars: {} };
-          notificationsData = notificationsSensor.attributes.notifications_data || {};
-        }
-      }
+    // Normalizza orario di inizio/fine giorno
+    start.setHours(0, 0, 0, 0);
+    end.setHours(23, 59, 59, 999);
+
+    return { start, end };
+  }
+
+  async _fetchBetterCalendarRange() {
+    // Eventi e notifiche dell'intervallo visibile dallo snapshot in memoria di Better Calendar
+    const { start, end } = this._getVisibleRange();
+    const result = await this._hass.callWS({
+      type: 'better_calendar/events',
+      start: start.toISOString(),
+      end: end.toISOString()
+    });
+
+    return {
+      eventsData: { events: result.events || {}, calendars: {} },
+      notificationsData: result.notifications || {}
+    };
+  }
 
-      // Se non abbiamo dati dal sensore, usa un refresh del coordinator (max 1 volta per sessione)
-      if (!eventsData.events || Object.keys(eventsData.events).length === 0) {
+  async _loadBetterCalendarData() {
+    // Carica eventi e notifiche tramite il comando websocket better_calendar/events
+    try {
+      let { eventsData, notificationsData } = await this._fetchBetterCalendarRange();
+
+      // Se non abbiamo dati, usa un refresh del coordinator (max 1 volta per sessione)
+      if (Object.keys(eventsData.events).length === 0) {
         if (!this._hasTriedRefresh) {
           this._hasTriedRefresh = true;
           try {
             await this._hass.callService('better_calendar', 'force_update_calendars', {});
-
-            // Aspetta un po' e riprova dal sensore
-            await new Promise(resolve => setTimeout(resolve, 500));
-
-            if (notificationsSensorId) {
-              const sensor = this._hass.states[notificationsSensorId];
-              if (sensor && sensor.attributes) {
-                eventsData = sensor.attributes.events_data || { events: {}, calendars: {} };
-                notificationsData = sensor.attributes.notifications_data || {};
-              }
-            }
+            ({ eventsData, notificationsData } = await this._fetchBetterCalendarRange());
           } catch (error) {
             console.warn('⚠️ Errore con force_update_calendars:', error);
           }
         }
       }
 
+      // Conserva le notifiche per le ricerche successive (popup notifiche)
+      this._notificationsData = notificationsData;
+
       // Integra le notifiche negli eventi se presenti
       if (Object.keys(notificationsData).length > 0 && eventsData.events) {
         for (const [calendarId, events] of Object.entries(eventsData.events)) {
@@ -4990,8 +5107,7 @@ class BetterCalendarCard extends LitElement {
       // Fallback: carica le notifiche direttamente dal sensore
       const notificationsSensor = await this._getNotificationsSensor();
       if (notificationsSensor) {
-        const sensorData = notificationsSensor.attributes || {};
-        const notificationsData = sensorData.notifications_data || {};
+        const notificationsData = this._notificationsData || {};
 
         // Associa le notifiche agli eventi HA
         for (const haEvent of haEvents) {
@@ -8434,92 +8550,83 @@ class BetterCalendarCard extends LitElement {
         return event.notifications;
       }
 
-      // Se non ci sono notifiche locali, prova dal sensore direttamente (senza ricaricamenti)
-      const entities = Object.keys(this._hass.states);
-      const notificationsSensorId = entities.find(id =>
-        id.includes('better_calendar') && id.includes('notifications')
-      );
-
-      if (notificationsSensorId) {
-        const sensor = this._hass.states[notificationsSensorId];
-
-        if (sensor && sensor.attributes && sensor.attributes.notifications_data) {
-          const notificationsData = sensor.attributes.notifications_data;
+      // Se non ci sono notifiche locali, usa quelle ricevute dal websocket (senza ricaricamenti)
+      if (this._notificationsData) {
+        const notificationsData = this._notificationsData;
 
-          // Cerca notifiche per questo evento con criteri più ampi
-          const eventNotifications = [];
-          for (const [notifId, notification] of Object.entries(notificationsData)) {
-            let isMatchingEvent = false;
+        // Cerca notifiche per questo evento con criteri più ampi
+        const eventNotifications = [];
+        for (const [notifId, notification] of Object.entries(notificationsData)) {
+          let isMatchingEvent = false;
 
-            // Prova matching per ID diretto
-            if (notification.event_id === eventId) {
-              isMatchingEvent = true;
-            }
+          // Prova matching per ID diretto
+          if (notification.event_id === eventId) {
+            isMatchingEvent = true;
+          }
 
-            // Prova matching per summary e data se abbiamo l'evento
-            if (!isMatchingEvent && event && notification.event_summary === event.summary) {
-              // Verifica anche la data se disponibile
-              if (notification.event_start && event.start) {
-                const notifDate = notification.event_start.split('T')[0];
-                const eventDate = (event.start?.dateTime || event.start?.date || '').split('T')[0];
+          // Prova matching per summary e data se abbiamo l'evento
+          if (!isMatchingEvent && event && notification.event_summary === event.summary) {
+            // Verifica anche la data se disponibile
+            if (notification.event_start && event.start) {
+              const notifDate = notification.event_start.split('T')[0];
+              const eventDate = (event.start?.dateTime || event.start?.date || '').split('T')[0];
 
-                if (notifDate === eventDate) {
-                  isMatchingEvent = true;
-                }
-              } else {
+              if (notifDate === eventDate) {
                 isMatchingEvent = true;
               }
+            } else {
+              isMatchingEvent = true;
             }
+          }
 
-            // Prova matching per eventi temporanei (cerca per summary e data simile)
-            if (!isMatchingEvent && eventId.startsWith('temp_')) {
-              const matchingEvent = this._events.find(e =>
-                e.summary === notification.event_summary &&
-                e.start && notification.event_start &&
-                (e.start.dateTime?.includes(notification.event_start.split('T')[0]) ||
-                 e.start.date?.includes(notification.event_start.split('T')[0]))
-              );
+          // Prova matching per eventi temporanei (cerca per summary e data simile)
+          if (!isMatchingEvent && eventId.startsWith('temp_')) {
+            const matchingEvent = this._events.find(e =>
+              e.summary === notification.event_summary &&
+              e.start && notification.event_start &&
+              (e.start.dateTime?.includes(notification.event_start.split('T')[0]) ||
+               e.start.date?.includes(notification.event_start.split('T')[0]))
+            );
 
-              if (matchingEvent) {
-                isMatchingEvent = true;
-                event = matchingEvent; // Aggiorna il riferimento all'evento
-              }
-            }
-
-            // Prova matching per Google Calendar ID con criteri più ampi
-            if (!isMatchingEvent && eventId.includes('@google.com')) {
-              // Cerca per tutti i possibili ID dell'evento
-              const currentEvent = this._events.find(e =>
-                e.id === eventId ||
-                e.uid === eventId ||
-                e.google_calendar_id === eventId ||
-                e.original_id === eventId
-              );
-
-              if (currentEvent && currentEvent.summary === notification.event_summary) {
-                isMatchingEvent = true;
-                event = currentEvent;
-              }
+            if (matchingEvent) {
+              isMatchingEvent = true;
+              event = matchingEvent; // Aggiorna il riferimento all'evento
             }
+          }
 
-            if (isMatchingEvent) {
-              eventNotifications.push({
-                id: notification.id,
-                notification_type: notification.notification_type,
-                offset_minutes: notification.offset_minutes,
-                target_device: notification.target_device,
-                enabled: notification.enabled !== false
-              });
+          // Prova matching per Google Calendar ID con criteri più ampi
+          if (!isMatchingEvent && eventId.includes('@google.com')) {
+            // Cerca per tutti i possibili ID dell'evento
+            const currentEvent = this._events.find(e =>
+              e.id === eventId ||
+              e.uid === eventId ||
+              e.google_calendar_id === eventId ||
+              e.original_id === eventId
+            );
+
+            if (currentEvent && currentEvent.summary === notification.event_summary) {
+              isMatchingEvent = true;
+              event = currentEvent;
             }
           }
 
-          // Aggiorna anche l'evento locale per la prossima volta
-          if (event) {
-            event.notifications = eventNotifications;
+          if (isMatchingEvent) {
+            eventNotifications.push({
+              id: notification.id,
+              notification_type: notification.notification_type,
+              offset_minutes: notification.offset_minutes,
+              target_device: notification.target_device,
+              enabled: notification.enabled !== false
+            });
           }
+        }
 
-          return eventNotifications;
+        // Aggiorna anche l'evento locale per la prossima volta
+        if (event) {
+          event.notifications = eventNotifications;
         }
+
+        return eventNotifications;
       }
 
       return [];